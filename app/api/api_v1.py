@@ -1,18 +1,27 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from datetime import datetime
 
 from app.models.pydantic_models import (
     User, UserCreate, UserUpdate, UserListResponse,
     Feedback, FeedbackCreate, FeedbackUpdate, FeedbackStatusUpdate, FeedbackListResponse,
-    Comment, CommentCreate, CommentUpdate, CommentListResponse,
+    FeedbackTagBatch, FeedbackTagBatchResult,
+    ImportResult,
+    Comment, CommentCreate, CommentUpdate, CommentListResponse, CommentWithAuthor, FeedbackDetail,
     Tag, TagCreate, TagListResponse,
-    Notification, NotificationCreate, NotificationListResponse,
-    UserStats, FeedbackStats, HotTag, FeedbackTrend,
+    Notification, NotificationCreate, NotificationListResponse, UnreadCount,
+    UserStats, FeedbackStats, HotTag, FeedbackTrend, CacheStats, NotificationWriteStats,
     MessageResponse
 )
+from app.core.config import settings
+from app.core.pagination import next_cursor
+from app.core.serialization import FastJSONResponse
+from app.core.response_cache import stats_response_cache
+from app.core.notification_hub import notification_hub
 from app.services import (
     UserService, FeedbackService, CommentService,
-    TagService, NotificationService, StatsService
+    TagService, NotificationService, StatsService, ImportService, ExportService
 )
 
 router = APIRouter()
@@ -49,10 +58,15 @@ async def get_user(user_id: int):
     return user
 
 @router.get("/users/", response_model=UserListResponse)
-async def get_users(skip: int = 0, limit: int = 100):
-    users = await UserService.get_users(skip=skip, limit=limit)
+async def get_users(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略 skip")
+):
+    users = await UserService.get_users(skip=skip, limit=limit, cursor=cursor)
     total = await UserService.get_users_count()
-    return {"users": users, "total": total}
+    # 行已按 User 的字段构造，跳过 response_model 校验直接编码
+    return FastJSONResponse({"users": users, "total": total, "next_cursor": next_cursor(users, limit)})
 
 @router.put("/users/{user_id}/", response_model=User)
 async def update_user(user_id: int, user_update: UserUpdate):
@@ -81,14 +95,58 @@ async def create_feedback(feedback: FeedbackCreate):
     db_feedback = await FeedbackService.create_feedback(feedback)
     return db_feedback
 
+@router.post("/feedback/import/", response_model=ImportResult)
+async def import_feedback(request: Request):
+    """请求体为 NDJSON，每行一个 FeedbackImportRow，边读边写入"""
+    result = await ImportService.import_feedback_ndjson(request.stream())
+    return result
+
 @router.get("/feedback/", response_model=FeedbackListResponse)
 async def get_feedback_list(
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = Query(None, description="反馈状态过滤")
+    status: Optional[str] = Query(None, description="反馈状态过滤"),
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略 skip")
 ):
-    feedbacks = await FeedbackService.get_feedback_list(skip=skip, limit=limit, status=status)
+    feedbacks = await FeedbackService.get_feedback_list(skip=skip, limit=limit, status=status, cursor=cursor)
     total = await FeedbackService.get_feedback_count(status=status)
+    return FastJSONResponse({"feedbacks": feedbacks, "total": total, "next_cursor": next_cursor(feedbacks, limit)})
+
+@router.get("/feedback/export/")
+async def export_feedback(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="导出格式：ndjson 或 csv"),
+    status: Optional[str] = Query(None, description="反馈状态过滤"),
+    created_from: Optional[datetime] = Query(None, description="创建时间下限（含）"),
+    created_to: Optional[datetime] = Query(None, description="创建时间上限（不含）"),
+    include_comments: bool = Query(False, description="是否附带评论")
+):
+    filters = {
+        "status": status,
+        "created_from": created_from,
+        "created_to": created_to,
+        "include_comments": include_comments
+    }
+    if format == "csv":
+        content, media_type = ExportService.export_csv(**filters), "text/csv; charset=utf-8"
+    else:
+        content, media_type = ExportService.export_ndjson(**filters), "application/x-ndjson"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="feedback.{format}"'}
+    )
+
+@router.get("/feedback/search/", response_model=FeedbackListResponse)
+async def search_feedback(
+    keyword: str = Query(
+        ..., description="搜索关键词，按子串匹配标题和正文；2 个字符及以上走全文索引，单个字符或含标点的 2 字符关键词逐行扫描"
+    ),
+    skip: int = 0,
+    limit: int = 100
+):
+    feedbacks = await FeedbackService.search_feedback(keyword=keyword, skip=skip, limit=limit)
+    total = await FeedbackService.search_feedback_count(keyword=keyword)
     return {"feedbacks": feedbacks, "total": total}
 
 @router.get("/feedback/{feedback_id}/", response_model=Feedback)
@@ -98,6 +156,40 @@ async def get_feedback(feedback_id: int):
         raise HTTPException(status_code=404, detail="反馈不存在")
     return feedback
 
+FEEDBACK_DETAIL_PARTS = ("tags", "comments", "comment_count")
+
+@router.get("/feedback/{feedback_id}/detail/", response_model=FeedbackDetail, response_model_exclude_none=True)
+async def get_feedback_detail(
+    feedback_id: int,
+    include: str = Query(",".join(FEEDBACK_DETAIL_PARTS), description="逗号分隔：tags, comments, comment_count"),
+    comment_limit: int = Query(20, ge=1, le=100, description="内嵌评论条数，后续页用 comments_next_cursor 调评论列表接口")
+):
+    """反馈详情页一次取齐：反馈本身（含 tags 时连同标签）+ 每个 include 部分各一次查询"""
+    parts = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = parts - set(FEEDBACK_DETAIL_PARTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"不支持的 include: {', '.join(sorted(unknown))}")
+    
+    # 不用 get_feedback_header：它的进程内缓存在多 worker 时可能返回旧的标题和状态
+    feedback = await FeedbackService.get_feedback(feedback_id, with_tags="tags" in parts)
+    if not feedback:
+        raise HTTPException(status_code=404, detail="反馈不存在")
+    
+    # ORM 对象上的 comments 是反向关系，先转成不含标签的 Feedback 再组装
+    detail = FeedbackDetail(**Feedback.model_validate(feedback).model_dump(exclude={"tags"}))
+    if "tags" in parts:
+        detail.tags = feedback.tags
+    if "comments" in parts:
+        comments = await CommentService.get_comments_with_authors(feedback_id, limit=comment_limit)
+        detail.comments = [
+            CommentWithAuthor(**Comment.model_validate(comment).model_dump(), author_name=comment.user.name)
+            for comment in comments
+        ]
+        detail.comments_next_cursor = next_cursor(comments, comment_limit)
+    if "comment_count" in parts:
+        detail.comment_count = await CommentService.get_comments_count(feedback_id)
+    return detail
+
 @router.put("/feedback/{feedback_id}/", response_model=Feedback)
 async def update_feedback(feedback_id: int, feedback_update: FeedbackUpdate):
     feedback = await FeedbackService.update_feedback(feedback_id, feedback_update)
@@ -119,15 +211,6 @@ async def update_feedback_status(feedback_id: int, status_update: FeedbackStatus
         raise HTTPException(status_code=404, detail="反馈不存在")
     return feedback
 
-@router.get("/feedback/search/", response_model=FeedbackListResponse)
-async def search_feedback(
-    keyword: str = Query(..., description="搜索关键词"),
-    skip: int = 0,
-    limit: int = 100
-):
-    feedbacks = await FeedbackService.search_feedback(keyword=keyword, skip=skip, limit=limit)
-    return {"feedbacks": feedbacks, "total": len(feedbacks)}
-
 # ------------------------
 # 评论管理路由
 # ------------------------
@@ -138,7 +221,7 @@ async def create_comment(comment: CommentCreate):
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     
-    feedback = await FeedbackService.get_feedback(comment.feedback_id)
+    feedback = await FeedbackService.get_feedback_header(comment.feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="反馈不存在")
     
@@ -148,14 +231,19 @@ async def create_comment(comment: CommentCreate):
     return db_comment
 
 @router.get("/feedback/{feedback_id}/comments/", response_model=CommentListResponse)
-async def get_comments(feedback_id: int, skip: int = 0, limit: int = 100):
-    feedback = await FeedbackService.get_feedback(feedback_id)
+async def get_comments(
+    feedback_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略 skip")
+):
+    feedback = await FeedbackService.get_feedback_header(feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="反馈不存在")
     
-    comments = await CommentService.get_comments(feedback_id=feedback_id, skip=skip, limit=limit)
+    comments = await CommentService.get_comments(feedback_id=feedback_id, skip=skip, limit=limit, cursor=cursor)
     total = await CommentService.get_comments_count(feedback_id=feedback_id)
-    return {"comments": comments, "total": total}
+    return {"comments": comments, "total": total, "next_cursor": next_cursor(comments, limit)}
 
 @router.put("/comments/{comment_id}/", response_model=Comment)
 async def update_comment(comment_id: int, comment_update: CommentUpdate):
@@ -186,6 +274,16 @@ async def get_tags(skip: int = 0, limit: int = 100):
     total = await TagService.get_tags_count()
     return {"tags": tags, "total": total}
 
+@router.post("/feedback/tags/batch/", response_model=FeedbackTagBatchResult)
+async def batch_update_feedback_tags(batch: FeedbackTagBatch):
+    result = await FeedbackService.batch_update_tags(batch.feedback_ids, batch.tag_names, batch.mode)
+    if result.missing_feedback_ids or result.missing_tags:
+        raise HTTPException(
+            status_code=404,
+            detail=f"反馈不存在: {result.missing_feedback_ids}，标签不存在: {result.missing_tags}"
+        )
+    return result
+
 @router.post("/feedback/{feedback_id}/tags/{tag_name}/", response_model=MessageResponse)
 async def add_tag_to_feedback(feedback_id: int, tag_name: str):
     success = await FeedbackService.add_tag_to_feedback(feedback_id, tag_name)
@@ -211,39 +309,111 @@ async def delete_tag(tag_id: int):
 # 统计功能路由
 # ------------------------
 
+# 统计接口经由响应缓存：相关数据未变化时不访问数据库，支持 ETag 条件请求
+
 @router.get("/stats/users/", response_model=UserStats)
-async def get_user_stats():
-    stats = await StatsService.get_user_stats()
-    return stats
+async def get_user_stats(request: Request):
+    return await stats_response_cache.respond(request, ("user",), StatsService.get_user_stats)
 
 @router.get("/stats/feedback/", response_model=FeedbackStats)
-async def get_feedback_stats():
-    stats = await StatsService.get_feedback_stats()
+async def get_feedback_stats(request: Request):
+    return await stats_response_cache.respond(request, ("feedback",), StatsService.get_feedback_stats)
+
+@router.post("/stats/feedback/rebuild/", response_model=FeedbackStats)
+async def rebuild_feedback_stats():
+    stats = await StatsService.rebuild_feedback_status_counts()
     return stats
 
 @router.get("/stats/hot-tags/", response_model=List[HotTag])
-async def get_hot_tags(limit: int = 10):
-    hot_tags = await StatsService.get_hot_tags(limit=limit)
-    return hot_tags
+async def get_hot_tags(request: Request, limit: int = 10):
+    return await stats_response_cache.respond(
+        request, ("tag",), lambda: StatsService.get_hot_tags(limit=limit)
+    )
 
 @router.get("/stats/feedback-trend/", response_model=List[FeedbackTrend])
-async def get_feedback_trend(days: int = 30):
-    trend = await StatsService.get_feedback_trend(days=days)
-    return trend
+async def get_feedback_trend(request: Request, days: int = Query(30, ge=1, le=settings.STATS_TREND_MAX_DAYS)):
+    return await stats_response_cache.respond(
+        request, ("feedback",), lambda: StatsService.get_feedback_trend(days=days)
+    )
+
+@router.post("/stats/feedback-trend/rebuild/", response_model=MessageResponse)
+async def rebuild_feedback_trend():
+    await StatsService.rebuild_feedback_daily_counts()
+    return {"message": "反馈每日汇总已重算"}
+
+@router.get("/stats/cache/", response_model=List[CacheStats])
+async def get_cache_stats():
+    return StatsService.get_cache_stats()
+
+@router.get("/stats/notification-writes/", response_model=NotificationWriteStats)
+async def get_notification_write_stats():
+    return StatsService.get_notification_write_stats()
 
 # ------------------------
 # 通知功能路由
 # ------------------------
 
 @router.get("/users/{user_id}/notifications/", response_model=NotificationListResponse)
-async def get_user_notifications(user_id: int, skip: int = 0, limit: int = 100):
+async def get_user_notifications(
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略 skip")
+):
     user = await UserService.get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     
-    notifications = await NotificationService.get_user_notifications(user_id=user_id, skip=skip, limit=limit)
+    notifications = await NotificationService.get_user_notifications(
+        user_id=user_id, skip=skip, limit=limit, cursor=cursor
+    )
     unread_count = await NotificationService.get_user_notifications_count(user_id=user_id, unread_only=True)
-    return {"notifications": notifications, "total": len(notifications), "unread_count": unread_count}
+    return FastJSONResponse({
+        "notifications": notifications,
+        "total": len(notifications),
+        "unread_count": unread_count,
+        "next_cursor": next_cursor(notifications, limit)
+    })
+
+@router.get("/users/{user_id}/notifications/unread-count/", response_model=UnreadCount)
+async def get_unread_notification_count(user_id: int):
+    user = await UserService.get_user(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="用户不存在")
+    
+    unread_count = await NotificationService.get_unread_count(user_id)
+    return {"user_id": user_id, "unread_count": unread_count}
+
+@router.get("/users/{user_id}/notifications/stream/")
+async def stream_user_notifications(user_id: int):
+    """SSE 推送：新通知（event: notification）和未读数变化（event: unread_count）"""
+    user = await UserService.get_user(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="用户不存在")
+    
+    # 连接数已满时在响应开始前返回 503；订阅本身在推送流内进行
+    notification_hub.check_capacity()
+    
+    async def initial_events():
+        unread_count = await NotificationService.get_unread_count(user_id)
+        return (("unread_count", {"user_id": user_id, "unread_count": unread_count}),)
+    
+    events = notification_hub.stream(
+        user_id,
+        initial_events=initial_events,
+        heartbeat_seconds=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS,
+        idle_timeout_seconds=settings.NOTIFICATION_STREAM_IDLE_TIMEOUT_SECONDS
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/notifications/unread-counts/rebuild/", response_model=MessageResponse)
+async def rebuild_unread_notification_counts():
+    await NotificationService.reconcile_unread_counts()
+    return {"message": "未读通知计数已重算"}
 
 @router.patch("/notifications/{notification_id}/read/", response_model=MessageResponse)
 async def mark_notification_as_read(notification_id: int):
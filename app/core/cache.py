@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.identity_map import current_scope
+
+_MISSING = object()
+
+
+class EntityCache:
+    """进程内读穿透缓存：容量有界（LRU 淘汰）+ TTL 过期。
+
+    写路径调用 invalidate/clear 失效；失效会推进 generation，
+    与失效并发的回源结果不会被写回缓存，避免把旧值重新放进去。
+    只缓存存在的实体，不做负缓存。
+
+    处于请求内时先查请求级身份映射（app.core.identity_map），同一请求内
+    同一实体只回源一次，且即使缓存被禁用或已过期也返回同一个对象。
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._generation = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        scope = current_scope()
+        scope_key = (self.name, key)
+        if scope is not None and scope_key in scope.entities:
+            scope.hits += 1
+            return scope.entities[scope_key]
+
+        value = self.get(key)
+        if value is _MISSING:
+            generation = self._generation
+            value = await loader()
+            if value is not None and generation == self._generation:
+                self.set(key, value)
+        if value is not None and scope is not None:
+            scope.entities[scope_key] = value
+        return value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        self._generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+        scope = current_scope()
+        if scope is not None:
+            for key in keys:
+                scope.entities.pop((self.name, key), None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+        scope = current_scope()
+        if scope is not None:
+            for scope_key in [k for k in scope.entities if k[0] == self.name]:
+                del scope.entities[scope_key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# User 按 id；Tag 按 ("id", id) 和 ("name", name)；Feedback 只缓存不带标签的行本身，
+# 供存在性检查使用。tags.usage_count 由触发器更新，缓存中的值可能滞后至多一个 TTL。
+user_cache = EntityCache("user", settings.ENTITY_CACHE_MAX_SIZE, settings.ENTITY_CACHE_TTL_SECONDS)
+tag_cache = EntityCache("tag", settings.ENTITY_CACHE_MAX_SIZE, settings.ENTITY_CACHE_TTL_SECONDS)
+feedback_cache = EntityCache("feedback", settings.ENTITY_CACHE_MAX_SIZE, settings.ENTITY_CACHE_TTL_SECONDS)
+
+entity_caches = [user_cache, tag_cache, feedback_cache]
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional, Dict, Any
+from tortoise.backends.base.config_generator import expand_db_url
 
 
 class Settings(BaseSettings):
@@ -8,11 +9,103 @@ class Settings(BaseSettings):
     
     DATABASE_URL: str = "sqlite://./feedback.db"
     
+    # SQLite 调优参数，每个新连接建立时以 PRAGMA 形式执行
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -65536  # 负数表示 KiB，即 64 MiB
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    
     API_V1_STR: str = "/api/v1"
     
+    # 统计按天切分时使用的时区（相对 UTC 的分钟偏移，如东八区为 480）
+    STATS_UTC_OFFSET_MINUTES: int = 0
+    STATS_TREND_MAX_DAYS: int = 3660
+    
+    # 密码哈希线程池大小，以及允许排队（含执行中）的最大任务数
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # 批量导入：每个事务写入的行数、单行最大字节数、结果中保留的错误条数
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+    IMPORT_MAX_ERRORS: int = 1000
+    
+    # 流式导出每次从数据库读取的行数
+    EXPORT_CHUNK_SIZE: int = 1000
+    
+    # 进程内实体缓存（User/Tag/Feedback）每类的最大条数和过期时间
+    ENTITY_CACHE_MAX_SIZE: int = 10000
+    ENTITY_CACHE_TTL_SECONDS: float = 60.0
+    
+    # 统计接口响应缓存的有效期（Cache-Control: max-age）
+    STATS_CACHE_MAX_AGE_SECONDS: int = 5
+    
+    # 未读通知计数的定期校准间隔（秒），0 表示不启动校准任务
+    NOTIFICATION_RECONCILE_INTERVAL_SECONDS: int = 3600
+    
+    # 通知推送（SSE）：心跳间隔、无事件断开时间（0 不限）、每连接积压上限、总连接数上限
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    NOTIFICATION_STREAM_IDLE_TIMEOUT_SECONDS: float = 600.0
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+    NOTIFICATION_STREAM_MAX_CONNECTIONS: int = 10000
+    
+    # 通知写入组提交：是否启用、每批最大条数、攒批等待时间（毫秒）、队列上限
+    NOTIFICATION_WRITE_BEHIND: bool = False
+    NOTIFICATION_WRITE_BATCH_SIZE: int = 500
+    NOTIFICATION_WRITE_FLUSH_INTERVAL_MS: float = 10.0
+    NOTIFICATION_WRITE_QUEUE_SIZE: int = 10000
+    
+    # 请求/SQL 指标采集与 /metrics 接口（Prometheus 文本格式）
+    METRICS_ENABLED: bool = True
+    
+    # 启动时只检查数据库结构版本，不一致则拒绝启动并提示运行 python migrate.py；
+    # 单进程本地开发可打开，启动时就地迁移
+    SCHEMA_AUTO_MIGRATE: bool = False
+    
+    # SQL 诊断（开发/预发）：慢查询阈值（毫秒）、同一语句每请求最多执行次数、
+    # 每请求默认 SQL 预算（0 不限）与按路由模板的预算、违规时是否让请求失败
+    DIAGNOSTICS_ENABLED: bool = False
+    DIAGNOSTICS_SLOW_QUERY_MS: float = 100.0
+    DIAGNOSTICS_REPEATED_QUERY_THRESHOLD: int = 5
+    DIAGNOSTICS_QUERY_BUDGET: int = 0
+    DIAGNOSTICS_ROUTE_QUERY_BUDGETS: Dict[str, int] = {}
+    DIAGNOSTICS_FAIL_ON_VIOLATION: bool = False
+    
+    # 在响应头中返回每个请求的 SQL 条数和身份映射命中数（X-Query-Count / X-Identity-Map-Hits）
+    DEBUG_QUERY_HEADERS: bool = False
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
+    
+    @property
+    def sqlite_pragmas(self) -> Dict[str, Any]:
+        return {
+            "journal_mode": self.SQLITE_JOURNAL_MODE,
+            "synchronous": self.SQLITE_SYNCHRONOUS,
+            "busy_timeout": self.SQLITE_BUSY_TIMEOUT_MS,
+            "cache_size": self.SQLITE_CACHE_SIZE,
+            "mmap_size": self.SQLITE_MMAP_SIZE,
+            "temp_store": self.SQLITE_TEMP_STORE,
+        }
+    
+    def tortoise_config(self, db_url: Optional[str] = None) -> Dict[str, Any]:
+        """Tortoise.init(config=...) 使用的配置，SQLite 连接附带调优 PRAGMA"""
+        connection = expand_db_url(db_url or self.DATABASE_URL)
+        if connection["engine"] == "tortoise.backends.sqlite":
+            connection["credentials"].update(self.sqlite_pragmas)
+        
+        return {
+            "connections": {"default": connection},
+            "apps": {
+                "models": {
+                    "models": ["app.models.tortoise_models"],
+                    "default_connection": "default",
+                }
+            },
+        }
 
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import route_label, install_query_hook, query_hooks
+
+logger = logging.getLogger("app.diagnostics")
+
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+class QueryBudgetExceededError(RuntimeError):
+    """请求或代码块执行的 SQL 超出预算，或同一语句重复次数超过阈值"""
+
+
+def normalize_statement(query: str) -> str:
+    """折叠空白，并把 IN (?, ?, ?) 这类长度可变的占位符列表归一为 ?...，用于识别同一条参数化语句"""
+    return _PLACEHOLDER_LIST.sub("?...", " ".join(query.split()))
+
+
+class QueryTally:
+    """一个请求（或 query_budget 代码块）内的 SQL 统计"""
+
+    __slots__ = ("scope", "budget", "fail", "parent", "total", "statements", "violations")
+
+    def __init__(self, scope: Optional[dict], budget: Optional[int], fail: bool, parent: Optional["QueryTally"]):
+        self.scope = scope
+        self.budget = budget
+        self.fail = fail
+        self.parent = parent
+        self.total = 0
+        self.statements: Dict[str, int] = {}
+        self.violations: List[str] = []
+
+    def top_statements(self, limit: int = 5) -> List[str]:
+        ranked = sorted(self.statements.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [f"{count}x {statement}" for statement, count in ranked]
+
+
+_current_tally: ContextVar[Optional[QueryTally]] = ContextVar("query_tally", default=None)
+
+
+class QueryDiagnostics:
+    """开发/预发环境的 SQL 诊断：慢查询日志（附 EXPLAIN QUERY PLAN）、N+1 检测和查询预算。
+
+    依赖 app.core.metrics 的 SQL 计时钩子；fail_on_violation 为 True 时，
+    超出预算或重复次数超限的那条语句之后抛出 QueryBudgetExceededError，
+    请求以 500 结束，便于在测试中直接失败。
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float,
+        repeat_threshold: int,
+        default_budget: int,
+        route_budgets: Dict[str, int],
+        fail_on_violation: bool
+    ):
+        self.slow_query_ms = slow_query_ms
+        self.repeat_threshold = repeat_threshold
+        self.default_budget = default_budget
+        self.route_budgets = route_budgets
+        self.fail_on_violation = fail_on_violation
+        self._plans: Dict[str, str] = {}
+        # 事件循环只持有任务的弱引用，进行中的 EXPLAIN 任务保存在这里，完成后移除
+        self._tasks: Set[asyncio.Task] = set()
+        self._explaining: Set[str] = set()
+
+    def install(self) -> None:
+        install_query_hook()
+        if self.on_query not in query_hooks:
+            query_hooks.append(self.on_query)
+
+    def on_query(self, query: str, values: Any, elapsed: float, route: str) -> None:
+        if query.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        if elapsed * 1000 >= self.slow_query_ms:
+            self._report_slow(query, values, elapsed, route)
+
+        tally = _current_tally.get()
+        if tally is None:
+            return
+        statement = normalize_statement(query)
+        violations = []
+        while tally is not None:
+            tally.total += 1
+            count = tally.statements.get(statement, 0) + 1
+            tally.statements[statement] = count
+            budget = self._budget_for(tally)
+            if count == self.repeat_threshold + 1:
+                violations.append((tally, f"同一语句在{self._describe(tally)}内已执行 {count} 次（可能是 N+1）: {statement}"))
+            if budget and tally.total == budget + 1:
+                violations.append((tally, f"{self._describe(tally)}的 SQL 超出预算 {budget} 条"))
+            tally = tally.parent
+
+        for owner, message in violations:
+            owner.violations.append(message)
+            logger.warning(message)
+            if owner.fail and owner.scope is not None:
+                raise QueryBudgetExceededError(message)
+
+    def _budget_for(self, tally: QueryTally) -> int:
+        if tally.budget is not None:
+            return tally.budget
+        return self.route_budgets.get(route_label(tally.scope), self.default_budget)
+
+    @staticmethod
+    def _describe(tally: QueryTally) -> str:
+        if tally.scope is None:
+            return "query_budget 代码块"
+        return f"请求 {tally.scope['method']} {route_label(tally.scope)} "
+
+    def _report_slow(self, query: str, values: Any, elapsed: float, route: str) -> None:
+        statement = normalize_statement(query)
+        plan = self._plans.get(statement)
+        if plan is not None or statement in self._explaining or query.lstrip()[:6].upper() not in _EXPLAINABLE:
+            # 同一语句的 EXPLAIN 仍在执行时不再重复发起，这次只记录耗时
+            logger.warning("slow query %.1fms [%s]: %s\n%s", elapsed * 1000, route, statement, plan or "")
+            return
+        # 钩子是同步调用的，EXPLAIN 放到后台任务里执行
+        self._explaining.add(statement)
+        task = asyncio.get_running_loop().create_task(self._explain_and_log(query, values, elapsed, route, statement))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain_and_log(self, query: str, values: Any, elapsed: float, route: str, statement: str) -> None:
+        from tortoise import connections
+
+        if values and isinstance(values[0], (list, tuple)):
+            # execute_many 取第一组参数
+            values = values[0]
+        try:
+            rows = await connections.get("default").execute_query_dict("EXPLAIN QUERY PLAN " + query, list(values or []))
+            plan = "\n".join(f"  {row['detail']}" for row in rows)
+        except Exception as exc:
+            plan = f"  (EXPLAIN 失败: {exc})"
+        finally:
+            self._explaining.discard(statement)
+        if len(self._plans) < 512:
+            self._plans[statement] = plan
+        logger.warning("slow query %.1fms [%s]: %s\n%s", elapsed * 1000, route, statement, plan)
+
+
+query_diagnostics = QueryDiagnostics(
+    slow_query_ms=settings.DIAGNOSTICS_SLOW_QUERY_MS,
+    repeat_threshold=settings.DIAGNOSTICS_REPEATED_QUERY_THRESHOLD,
+    default_budget=settings.DIAGNOSTICS_QUERY_BUDGET,
+    route_budgets=settings.DIAGNOSTICS_ROUTE_QUERY_BUDGETS,
+    fail_on_violation=settings.DIAGNOSTICS_FAIL_ON_VIOLATION,
+)
+
+
+class DiagnosticsMiddleware:
+    """为每个请求建立 QueryTally；route 预算在第一条 SQL 时按路由模板确定"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = _current_tally.get()
+        token = _current_tally.set(QueryTally(scope, None, query_diagnostics.fail_on_violation, parent))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_tally.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryTally]:
+    """测试/脚本用：代码块内（含其中发起的进程内 ASGI 请求）执行的 SQL 超过 max_queries 条时，
+    在退出代码块时抛出 QueryBudgetExceededError，附上执行次数最多的语句
+
+        with query_budget(3):
+            await client.get("/api/v1/feedback/")
+    """
+    query_diagnostics.install()
+    tally = QueryTally(None, max_queries, True, _current_tally.get())
+    token = _current_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _current_tally.reset(token)
+    if tally.total > max_queries:
+        raise QueryBudgetExceededError(
+            f"执行了 {tally.total} 条 SQL，预算 {max_queries} 条:\n  " + "\n  ".join(tally.top_statements())
+        )
@@ -0,0 +1,76 @@
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, Optional
+
+
+class RequestScope:
+    """单个请求内的身份映射和查询计数。
+
+    同一请求内按 (实体类型, 键) 查过的行直接复用同一个对象，保证一个 User/Tag/Feedback
+    在一次请求中最多访问数据库一次。请求结束即丢弃，不存在跨请求的陈旧数据。
+    """
+
+    __slots__ = ("entities", "queries", "hits")
+
+    def __init__(self):
+        self.entities: Dict[Hashable, Any] = {}
+        self.queries = 0
+        self.hits = 0
+
+
+_current_scope: ContextVar[Optional[RequestScope]] = ContextVar("request_scope", default=None)
+
+
+def current_scope() -> Optional[RequestScope]:
+    return _current_scope.get()
+
+
+class _QueryCounter(logging.Handler):
+    """挂在 tortoise.db_client 日志上，每条 SQL 给当前请求计数一次"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.queries += 1
+
+
+def enable_query_counting() -> None:
+    logger = logging.getLogger("tortoise.db_client")
+    if not any(isinstance(handler, _QueryCounter) for handler in logger.handlers):
+        logger.addHandler(_QueryCounter(level=logging.DEBUG))
+        logger.setLevel(logging.DEBUG)
+
+
+class RequestScopeMiddleware:
+    """为每个 HTTP 请求绑定新的 RequestScope；debug_headers 为 True 时在响应头中
+    返回本请求的 SQL 条数（X-Query-Count）和身份映射命中数（X-Identity-Map-Hits）。
+
+    流式响应的响应头在第一块数据之前发出，计数只包含此前执行的查询。
+    """
+
+    def __init__(self, app, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+        if debug_headers:
+            enable_query_counting()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_scope = RequestScope()
+        token = _current_scope.set(request_scope)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(request_scope.queries).encode()))
+                headers.append((b"x-identity-map-hits", str(request_scope.hits).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers if self.debug_headers else send)
+        finally:
+            _current_scope.reset(token)
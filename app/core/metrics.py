@@ -0,0 +1,216 @@
+import bisect
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 请求延迟与 SQL 耗时的直方图分桶（秒）
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class CallbackMetric:
+    """采集时通过回调取值的指标，用于导出其他模块已有的计数（metric_type 为 gauge 或 counter）"""
+
+    def __init__(self, name: str, help_text: str, collect: Callable[[], float], metric_type: str = "gauge"):
+        self.name = name
+        self.help_text = help_text
+        self.collect = collect
+        self.metric_type = metric_type
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {self.collect():g}",
+        ]
+
+
+class Histogram:
+    """累计分桶直方图；observe 只做一次二分查找和两次加法"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [各桶计数（非累计）..., +Inf 桶计数, sum]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative:g}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status")
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"), REQUEST_BUCKETS
+))
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "SQL statements executed, by route template and statement type.", ("route", "statement")
+))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency including wait for the connection, by route template and statement type.",
+    ("route", "statement"),
+    QUERY_BUCKETS,
+))
+_in_progress = 0
+registry.register(CallbackMetric("http_requests_in_progress", "HTTP requests currently being served.", lambda: _in_progress))
+
+# 当前请求的 ASGI scope；路由匹配后 scope["route"] 才可用，因此保存 scope 本身
+_current_request: ContextVar[Optional[dict]] = ContextVar("metrics_request", default=None)
+_in_query: ContextVar[bool] = ContextVar("metrics_in_query", default=False)
+
+
+def route_label(scope: Optional[dict]) -> str:
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _statement_type(query: str) -> str:
+    head = query.lstrip()[:8].split(None, 1)
+    return head[0].upper() if head else "OTHER"
+
+
+class MetricsMiddleware:
+    """记录每个请求的延迟和状态码；route 标签取路由模板（如 /feedback/{feedback_id}/），避免高基数"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_progress
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current_request.set(scope)
+        _in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_progress -= 1
+            _current_request.reset(token)
+            route = route_label(scope)
+            http_requests_total.inc((scope["method"], route, str(status)))
+            http_request_duration.observe((scope["method"], route), elapsed)
+
+
+# 每条 SQL 执行完后调用 hook(query, values, elapsed_seconds, route)
+query_hooks: List[Callable[[str, Any, float, str], None]] = []
+
+
+def _timed(method):
+    @functools.wraps(method)
+    async def wrapper(self, query, *args, **kwargs):
+        # 嵌套调用（一个 execute_* 内部调用另一个）只计一次
+        if _in_query.get():
+            return await method(self, query, *args, **kwargs)
+        token = _in_query.set(True)
+        started = time.perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_query.reset(token)
+            labels = (route_label(_current_request.get()), _statement_type(query))
+            db_queries_total.inc(labels)
+            db_query_duration.observe(labels, elapsed)
+            for hook in query_hooks:
+                hook(query, args[0] if args else kwargs.get("values"), elapsed, labels[0])
+
+    wrapper._metrics_wrapped = True
+    return wrapper
+
+
+def _all_subclasses(cls) -> Iterable[type]:
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_subclasses(subclass)
+
+
+def install_query_hook() -> None:
+    """给已加载的所有 Tortoise 数据库客户端类（含事务包装类）的 execute_* 方法加计时，可重复调用"""
+    from tortoise.backends.base.client import BaseDBAsyncClient
+
+    for cls in [BaseDBAsyncClient, *_all_subclasses(BaseDBAsyncClient)]:
+        for name, method in list(vars(cls).items()):
+            if name.startswith("execute_") and callable(method) and not getattr(method, "_metrics_wrapped", False):
+                setattr(cls, name, _timed(method))
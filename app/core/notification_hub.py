@@ -0,0 +1,187 @@
+import asyncio
+import json
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Sequence, Set, Tuple
+
+from app.core.config import settings
+
+
+class NotificationHubFullError(Exception):
+    """推送连接数达到上限"""
+
+
+class Subscription:
+    """单个推送连接的待发送事件队列。
+
+    队列有界：消费过慢导致积压超过上限时丢弃积压并标记 overflowed，
+    由推送流通知客户端重新拉取后断开，发布方永远不会被慢连接阻塞。
+    """
+
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self.overflowed = False
+        self.closed = False
+        self._events: Deque[Tuple[str, str, Optional[int]]] = deque()
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: str, data: str, event_id: Optional[int] = None) -> None:
+        if self.closed or self.overflowed:
+            return
+        if len(self._events) >= self.max_queue:
+            self._events.clear()
+            self.overflowed = True
+        else:
+            self._events.append((event, data, event_id))
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wakeup.set()
+
+    async def next_event(self, timeout: float) -> Optional[Tuple[str, str, Optional[int]]]:
+        """取下一条事件；超时返回 None，连接关闭或溢出时同样返回 None"""
+        if not self._events and not self.closed and not self.overflowed:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._events:
+            return self._events.popleft()
+        return None
+
+
+class NotificationHub:
+    """进程内的按用户发布/订阅中心，供 SSE 推送使用。
+
+    只在单进程内广播；多 worker 部署时每个进程只推送本进程产生的事件。
+    """
+
+    def __init__(self, max_connections: int, max_queue: int):
+        self.max_connections = max_connections
+        self.max_queue = max_queue
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._count = 0
+
+    @property
+    def connection_count(self) -> int:
+        return self._count
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def check_capacity(self) -> None:
+        if self._count >= self.max_connections:
+            raise NotificationHubFullError("推送连接数已达上限，请稍后重试")
+
+    def subscribe(self, user_id: int) -> Subscription:
+        self.check_capacity()
+        subscription = Subscription(user_id, self.max_queue)
+        self._subscribers[user_id].add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: int, event: str, payload: Any, event_id: Optional[int] = None) -> None:
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        for subscription in subscribers:
+            overflowed = subscription.overflowed
+            subscription.push(event, data, event_id)
+            if subscription.overflowed and not overflowed:
+                self.dropped += 1
+        self.published += 1
+
+    def close_all(self) -> None:
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self.unsubscribe(subscription)
+
+    async def stream(
+        self,
+        user_id: int,
+        initial_events: Optional[Callable[[], Awaitable[Sequence[Tuple[str, Any]]]]] = None,
+        heartbeat_seconds: float = 15.0,
+        idle_timeout_seconds: float = 0
+    ) -> AsyncIterator[str]:
+        """订阅 user_id 的事件并转成 SSE 文本流。
+
+        订阅在生成器开始执行时进行，与 finally 中的取消订阅总是成对出现：
+        客户端在第一次读取前断开时生成器不会启动，也就不占用连接数。
+        订阅后再调用 initial_events 取初始事件，不会错过两者之间发布的事件。
+        空闲期间按 heartbeat_seconds 发送注释行保活；超过 idle_timeout_seconds
+        没有业务事件时结束流（0 表示不限），客户端按 retry 间隔自动重连。
+        """
+        retry = f"retry: {int(heartbeat_seconds * 1000)}\n\n"
+        try:
+            subscription = self.subscribe(user_id)
+        except NotificationHubFullError:
+            # 路由已预先检查过容量，并发连接仍可能在此之间占满，让客户端稍后重连
+            yield retry
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            yield retry
+            for event, payload in (await initial_events() if initial_events else ()):
+                yield self.format_event(event, json.dumps(payload, ensure_ascii=False, default=str))
+
+            last_event_at = loop.time()
+            while True:
+                wait = heartbeat_seconds
+                if idle_timeout_seconds > 0:
+                    remaining = idle_timeout_seconds - (loop.time() - last_event_at)
+                    if remaining <= 0:
+                        yield self.format_event("timeout", "{}")
+                        return
+                    wait = min(wait, remaining)
+
+                item = await subscription.next_event(wait)
+                if subscription.overflowed:
+                    # 积压已丢弃，让客户端重新拉取列表和未读数
+                    yield self.format_event("resync", "{}")
+                    return
+                if item is not None:
+                    last_event_at = loop.time()
+                    yield self.format_event(*item)
+                elif subscription.closed:
+                    return
+                else:
+                    yield ": ping\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    @staticmethod
+    def format_event(event: str, data: str, event_id: Optional[int] = None) -> str:
+        lines = [f"event: {event}"]
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"data: {data}")
+        return "\n".join(lines) + "\n\n"
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": self._count,
+            "users": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+notification_hub = NotificationHub(
+    max_connections=settings.NOTIFICATION_STREAM_MAX_CONNECTIONS,
+    max_queue=settings.NOTIFICATION_STREAM_QUEUE_SIZE,
+)
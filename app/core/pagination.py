@@ -0,0 +1,45 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple, List, Any
+
+from tortoise.queryset import Q
+
+
+# 游标分页统一按 (created_at, id) 倒序，id 作为同一时间戳内的决胜键
+KEYSET_ORDERING = ("-created_at", "-id")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidCursorError("无效的分页游标") from exc
+
+
+def keyset_filter(cursor: str) -> Q:
+    """返回排在游标之后（更早）的行的过滤条件"""
+    created_at, id = decode_cursor(cursor)
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=id)
+
+
+def next_cursor(rows: List[Any], limit: int) -> Optional[str]:
+    """整页取满时用最后一行（模型实例或 dict 行）生成下一页游标，否则说明已经到底"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if isinstance(last, dict):
+        return encode_cursor(last["created_at"], last["id"])
+    return encode_cursor(last.created_at, last.id)
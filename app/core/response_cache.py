@@ -0,0 +1,95 @@
+import hashlib
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+
+class DataVersions:
+    """按数据域（feedback/tag/user）递增的版本号，写路径调用 bump"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = defaultdict(int)
+
+    def bump(self, *domains: str) -> None:
+        for domain in domains:
+            self._versions[domain] += 1
+
+    def snapshot(self, domains: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions[domain] for domain in domains)
+
+
+data_versions = DataVersions()
+
+
+class _Entry:
+    __slots__ = ("versions", "expires_at", "etag", "body")
+
+    def __init__(self, versions: Tuple[int, ...], expires_at: float, etag: str, body: bytes):
+        self.versions = versions
+        self.expires_at = expires_at
+        self.etag = etag
+        self.body = body
+
+
+class ResponseCache:
+    """GET 接口的响应缓存，支持强 ETag 与 If-None-Match 条件请求。
+
+    缓存项在依赖的数据域版本变化或超过 max_age 后失效；命中时不访问数据库。
+    版本号是进程内的，多 worker 部署下其他进程的写入最多延迟 max_age 秒可见。
+    """
+
+    def __init__(self, max_age: int, max_entries: int = 1024):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+
+    async def respond(
+        self,
+        request: Request,
+        domains: Tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        key = (request.url.path, str(request.query_params))
+        versions = data_versions.snapshot(domains)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is None or entry.versions != versions or entry.expires_at < now:
+            body = JSONResponse(jsonable_encoder(await compute())).body
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            entry = _Entry(versions, now + self.max_age, etag, body)
+            self._store(key, entry)
+
+        headers = {"ETag": entry.etag, "Cache-Control": f"max-age={self.max_age}"}
+        if self._etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _store(self, key: Tuple[str, str], entry: _Entry) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            # 先清理过期项，仍然满则丢弃最早写入的一项
+            now = time.monotonic()
+            for stale_key in [k for k, e in self._entries.items() if e.expires_at < now]:
+                del self._entries[stale_key]
+            if len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        self._entries[key] = entry
+
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        candidates = [value.strip() for value in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+
+stats_response_cache = ResponseCache(max_age=settings.STATS_CACHE_MAX_AGE_SECONDS)
@@ -0,0 +1,86 @@
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Sequence
+
+from fastapi.responses import JSONResponse
+from tortoise import fields
+from tortoise.queryset import QuerySet
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时退回标准库，输出内容相同
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # 与 pydantic 的 JSON 输出一致：UTC 时间以 Z 结尾
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """直接编码路由返回的 dict/list（优先使用 orjson），不经过 response_model 校验和 jsonable_encoder。
+
+    只用于字段直接取自数据库列、结构与 response_model 一致的可信输出；
+    路由上保留 response_model 以生成 OpenAPI 文档。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _fast_datetime(field: fields.DatetimeField) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return field.to_python_value(value)
+    return convert
+
+
+async def _raw_values(query: QuerySet, field_names: Sequence[str]) -> Sequence[Sequence[Any]]:
+    """执行 values_list 对应的 SQL，返回数据库驱动给出的原始行，不做字段转换。
+
+    依赖 Tortoise 的内部接口（ValuesListQuery.sql()、.query.get_parameterized_sql()、._db），
+    已在 pyproject 中限定的 tortoise-orm 版本范围（0.25 至 1.x）上验证；sql() 按 using_db
+    和事务选定连接，SQL 在同一连接上执行。
+    升级后这些接口不可用时退回公开的 values_list，结果相同，只是时间列按 Tortoise 的方式解析。
+    """
+    values_query = query.values_list(*field_names)
+    try:
+        values_query.sql()  # 选定连接并构造查询
+        sql, params = values_query.query.get_parameterized_sql()
+        db = values_query._db
+    except (AttributeError, TypeError):
+        return await values_query
+    _, rows = await db.execute_query(sql, params)
+    return rows
+
+
+async def fetch_rows(query: QuerySet, field_names: Sequence[str]) -> List[Dict[str, Any]]:
+    """按 field_names 取回行元组并直接构造 dict，结果与 values_list 相同，但不实例化模型。
+
+    时间列先用 datetime.fromisoformat（C 实现）解析再交给字段做时区处理；
+    Tortoise 逐值调用的 iso8601 解析是长列表上最主要的 CPU 开销。
+    """
+    model = query.model
+    converters = []
+    for name in field_names:
+        field = model._meta.fields_map[name]
+        converters.append(_fast_datetime(field) if isinstance(field, fields.DatetimeField) else field.to_python_value)
+
+    rows = await _raw_values(query, field_names)
+    return [
+        {name: convert(value) for name, convert, value in zip(field_names, converters, row)}
+        for row in rows
+    ]
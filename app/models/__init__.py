@@ -1,20 +1,25 @@
 from app.models.pydantic_models import (
     User, UserCreate, UserUpdate, UserListResponse,
     Feedback, FeedbackCreate, FeedbackUpdate, FeedbackStatusUpdate, FeedbackListResponse,
-    Comment, CommentCreate, CommentUpdate, CommentListResponse,
+    FeedbackTagBatch, FeedbackTagBatchResult,
+    FeedbackImportRow, ImportRowError, ImportResult,
+    Comment, CommentCreate, CommentUpdate, CommentListResponse, CommentWithAuthor, FeedbackDetail,
     Tag, TagCreate, TagListResponse,
-    Notification, NotificationCreate, NotificationListResponse,
-    UserStats, FeedbackStats, HotTag, FeedbackTrend,
+    Notification, NotificationCreate, NotificationListResponse, UnreadCount,
+    UserStats, FeedbackStats, HotTag, FeedbackTrend, CacheStats, NotificationWriteStats,
     MessageResponse
 )
 
 from app.models.tortoise_models import (
     User as UserModel,
     Feedback as FeedbackModel,
+    FeedbackStatusCount as FeedbackStatusCountModel,
+    FeedbackDailyCount as FeedbackDailyCountModel,
     Comment as CommentModel,
     Tag as TagModel,
     FeedbackTag as FeedbackTagModel,
     Notification as NotificationModel,
+    UserNotificationCount as UserNotificationCountModel,
     init_db,
     close_db
 )
@@ -22,11 +27,15 @@ from app.models.tortoise_models import (
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserListResponse",
     "Feedback", "FeedbackCreate", "FeedbackUpdate", "FeedbackStatusUpdate", "FeedbackListResponse",
-    "Comment", "CommentCreate", "CommentUpdate", "CommentListResponse",
+    "FeedbackTagBatch", "FeedbackTagBatchResult",
+    "FeedbackImportRow", "ImportRowError", "ImportResult",
+    "Comment", "CommentCreate", "CommentUpdate", "CommentListResponse", "CommentWithAuthor", "FeedbackDetail",
     "Tag", "TagCreate", "TagListResponse",
-    "Notification", "NotificationCreate", "NotificationListResponse",
-    "UserStats", "FeedbackStats", "HotTag", "FeedbackTrend",
+    "Notification", "NotificationCreate", "NotificationListResponse", "UnreadCount",
+    "UserStats", "FeedbackStats", "HotTag", "FeedbackTrend", "CacheStats", "NotificationWriteStats",
     "MessageResponse",
-    "UserModel", "FeedbackModel", "CommentModel", "TagModel", "FeedbackTagModel", "NotificationModel",
+    "UserModel", "FeedbackModel", "FeedbackStatusCountModel", "FeedbackDailyCountModel",
+    "CommentModel", "TagModel", "FeedbackTagModel", "NotificationModel",
+    "UserNotificationCountModel",
     "init_db", "close_db"
 ]
\ No newline at end of file
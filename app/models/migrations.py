@@ -0,0 +1,259 @@
+import hashlib
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from tortoise import Tortoise, connections
+from tortoise.exceptions import OperationalError
+from tortoise.transactions import in_transaction
+from tortoise.utils import get_schema_sql
+
+from app.core.config import settings
+from app.models.sqlite_schema import (
+    FEEDBACK_BIGRAM_SQL, FEEDBACK_DAILY_COUNTS_SQL, FEEDBACK_FTS_SQL, FEEDBACK_STATUS_COUNTS_SQL,
+    TAG_USAGE_COUNTS_SQL, USER_NOTIFICATION_COUNTS_SQL,
+    day_modifier, init_sqlite_schema
+)
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """数据库结构与代码不一致，需要先运行迁移"""
+
+
+# 版本化迁移：(版本号, 说明, 语句列表)。已发布的迁移不可修改，结构变更一律追加新版本。
+# 每个版本的语句与版本记录在同一事务中执行。
+# 全文索引和计数触发器不在这里，由 init_sqlite_schema 在迁移后按当前配置同步。
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (1, "初始结构（兼容此前由 generate_schemas 创建的库）", [
+        """CREATE TABLE IF NOT EXISTS "feedback_daily_counts" (
+            "day" VARCHAR(10) NOT NULL PRIMARY KEY,
+            "count" INT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS "feedback_status_counts" (
+            "status" VARCHAR(20) NOT NULL PRIMARY KEY,
+            "count" INT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS "tags" (
+            "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            "name" VARCHAR(50) NOT NULL UNIQUE,
+            "description" VARCHAR(200),
+            "created_at" TIMESTAMP NOT NULL,
+            "usage_count" INT NOT NULL
+        )""",
+        'CREATE INDEX IF NOT EXISTS "idx_tags_name_15558f" ON "tags" ("name")',
+        """CREATE TABLE IF NOT EXISTS "users" (
+            "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            "username" VARCHAR(50) NOT NULL UNIQUE,
+            "email" VARCHAR(100) NOT NULL UNIQUE,
+            "name" VARCHAR(100) NOT NULL,
+            "password_hash" VARCHAR(255) NOT NULL,
+            "created_at" TIMESTAMP NOT NULL,
+            "updated_at" TIMESTAMP NOT NULL
+        )""",
+        'CREATE INDEX IF NOT EXISTS "idx_users_usernam_266d85" ON "users" ("username")',
+        'CREATE INDEX IF NOT EXISTS "idx_users_email_133a6f" ON "users" ("email")',
+        'CREATE INDEX IF NOT EXISTS "idx_users_created_eeb5e9" ON "users" ("created_at", "id")',
+        """CREATE TABLE IF NOT EXISTS "feedbacks" (
+            "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            "title" VARCHAR(200) NOT NULL,
+            "content" TEXT NOT NULL,
+            "status" VARCHAR(20) NOT NULL,
+            "created_at" TIMESTAMP NOT NULL,
+            "updated_at" TIMESTAMP NOT NULL,
+            "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE
+        )""",
+        'CREATE INDEX IF NOT EXISTS "idx_feedbacks_title_105617" ON "feedbacks" ("title")',
+        'CREATE INDEX IF NOT EXISTS "idx_feedbacks_status_7d5e95" ON "feedbacks" ("status")',
+        'CREATE INDEX IF NOT EXISTS "idx_feedbacks_created_77f47e" ON "feedbacks" ("created_at")',
+        'CREATE INDEX IF NOT EXISTS "idx_feedbacks_created_dd18d7" ON "feedbacks" ("created_at", "id")',
+        """CREATE TABLE IF NOT EXISTS "comments" (
+            "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            "content" TEXT NOT NULL,
+            "created_at" TIMESTAMP NOT NULL,
+            "updated_at" TIMESTAMP NOT NULL,
+            "feedback_id" INT NOT NULL REFERENCES "feedbacks" ("id") ON DELETE CASCADE,
+            "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE
+        )""",
+        'CREATE INDEX IF NOT EXISTS "idx_comments_feedbac_a6c653" ON "comments" ("feedback_id", "created_at", "id")',
+        """CREATE TABLE IF NOT EXISTS "feedback_tags" (
+            "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            "feedback_id" INT NOT NULL REFERENCES "feedbacks" ("id") ON DELETE CASCADE,
+            "tag_id" INT NOT NULL REFERENCES "tags" ("id") ON DELETE CASCADE,
+            CONSTRAINT "uid_feedback_ta_feedbac_8f3944" UNIQUE ("feedback_id", "tag_id")
+        )""",
+        """CREATE TABLE IF NOT EXISTS "notifications" (
+            "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            "title" VARCHAR(200) NOT NULL,
+            "content" TEXT NOT NULL,
+            "is_read" INT NOT NULL,
+            "created_at" TIMESTAMP NOT NULL,
+            "user_id" INT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE
+        )""",
+        'CREATE INDEX IF NOT EXISTS "idx_notificatio_created_5f34f1" ON "notifications" ("created_at")',
+        'CREATE INDEX IF NOT EXISTS "idx_notificatio_user_id_0ebfd0" ON "notifications" ("user_id", "created_at", "id")',
+        """CREATE TABLE IF NOT EXISTS "user_notification_counts" (
+            "user_id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+            "unread_count" INT NOT NULL
+        )""",
+    ]),
+    (2, "按服务查询形状补充组合索引和外键索引（见 benchmarks/query_plans.py）", [
+        # 按状态筛选的列表按 (created_at, id) 倒序分页
+        'CREATE INDEX IF NOT EXISTS "idx_feedbacks_status_3ff125" ON "feedbacks" ("status", "created_at", "id")',
+        # 全部已读、未读计数重建按 (user_id, is_read) 查找
+        'CREATE INDEX IF NOT EXISTS "idx_notificatio_user_id_3674cf" ON "notifications" ("user_id", "is_read", "created_at")',
+        # 删除标签及其级联、使用次数重算按 tag_id 查找
+        'CREATE INDEX IF NOT EXISTS "idx_feedback_ta_tag_id_cb875f" ON "feedback_tags" ("tag_id", "feedback_id")',
+        'CREATE INDEX IF NOT EXISTS "idx_tags_usage_c_84c918" ON "tags" ("usage_count")',
+        # 删除用户时级联删除反馈和评论
+        'CREATE INDEX IF NOT EXISTS "idx_feedbacks_user_id_8888cd" ON "feedbacks" ("user_id")',
+        'CREATE INDEX IF NOT EXISTS "idx_comments_user_id_d0d99f" ON "comments" ("user_id")',
+        "ANALYZE",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+SCHEMA_TABLES_SQL = [
+    """CREATE TABLE IF NOT EXISTS "schema_migrations" (
+        "version" INTEGER NOT NULL PRIMARY KEY,
+        "description" TEXT NOT NULL,
+        "applied_at" TEXT NOT NULL
+    )""",
+    # 只有一行：当前版本和迁移完成时的结构指纹，启动检查只读这一行
+    """CREATE TABLE IF NOT EXISTS "schema_version" (
+        "id" INTEGER NOT NULL PRIMARY KEY CHECK ("id" = 1),
+        "version" INTEGER NOT NULL,
+        "fingerprint" TEXT NOT NULL,
+        "migrated_at" TEXT NOT NULL
+    )""",
+]
+
+_INDEX_NAME = re.compile(r'CREATE INDEX IF NOT EXISTS "(\w+)"')
+
+
+def schema_fingerprint() -> str:
+    """代码期望的结构指纹：迁移列表和 ORM 之外的 SQLite 对象（含按时区偏移生成的触发器），
+    即实际执行的原始 SQL。不包含 ORM 生成的 DDL 文本，升级 Tortoise 只改变其格式时不会
+    让已迁移的库失效；模型与迁移是否一致由 migrate() 中的 schema_drift 检查。纯计算，不访问数据库"""
+    digest = hashlib.sha256()
+    for sql in (
+        FEEDBACK_FTS_SQL, FEEDBACK_BIGRAM_SQL, FEEDBACK_STATUS_COUNTS_SQL, TAG_USAGE_COUNTS_SQL,
+        USER_NOTIFICATION_COUNTS_SQL, FEEDBACK_DAILY_COUNTS_SQL, day_modifier(settings.STATS_UTC_OFFSET_MINUTES),
+    ):
+        digest.update(sql.encode())
+    for version, _, statements in MIGRATIONS:
+        digest.update(str(version).encode())
+        digest.update("\n".join(statements).encode())
+    return digest.hexdigest()[:16]
+
+
+async def get_schema_state(connection_name: str = "default") -> Optional[Tuple[int, str]]:
+    """数据库记录的 (版本, 指纹)；尚未迁移过的库返回 None"""
+    conn = connections.get(connection_name)
+    try:
+        rows = await conn.execute_query_dict('SELECT "version", "fingerprint" FROM "schema_version" WHERE "id" = 1')
+    except OperationalError:
+        return None
+    return (rows[0]["version"], rows[0]["fingerprint"]) if rows else None
+
+
+async def pending_migrations(connection_name: str = "default") -> List[Tuple[int, str, List[str]]]:
+    conn = connections.get(connection_name)
+    try:
+        rows = await conn.execute_query_dict('SELECT "version" FROM "schema_migrations"')
+    except OperationalError:
+        return list(MIGRATIONS)
+    applied = {row["version"] for row in rows}
+    return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+
+async def apply_migrations(connection_name: str = "default") -> List[int]:
+    """执行尚未执行的版本化迁移，返回本次执行的版本号"""
+    conn = connections.get(connection_name)
+    for statement in SCHEMA_TABLES_SQL:
+        await conn.execute_query(statement)
+
+    applied = []
+    for version, description, statements in await pending_migrations(connection_name):
+        async with in_transaction(connection_name) as tx:
+            # 多个进程同时迁移时逐版本串行：先用一条不改变数据的写语句取得写锁
+            # （Tortoise 发出的是延迟 BEGIN），再确认该版本没有被其他进程执行过
+            await tx.execute_query('UPDATE "schema_migrations" SET "version" = "version" WHERE 0')
+            done = await tx.execute_query_dict('SELECT 1 FROM "schema_migrations" WHERE "version" = ?', [version])
+            if done:
+                continue
+            for statement in statements:
+                await tx.execute_query(statement)
+            await tx.execute_query(
+                'INSERT INTO "schema_migrations" ("version", "description", "applied_at") VALUES (?, ?, ?)',
+                [version, description, _now()]
+            )
+        applied.append(version)
+    return applied
+
+
+async def schema_drift(connection_name: str = "default") -> List[str]:
+    """ORM 模型中有、数据库中没有的列和索引，说明模型改了却没有追加迁移"""
+    conn = connections.get(connection_name)
+    problems = []
+    # Tortoise 0.25 的 apps 是普通 dict，1.x 是 Apps 对象，两者都支持 values()
+    models = [model for app_models in Tortoise.apps.values() for model in app_models.values()]
+    for model in models:
+        if model._meta.default_connection != connection_name:
+            continue
+        table = model._meta.db_table
+        rows = await conn.execute_query_dict(f'PRAGMA table_info("{table}")')
+        existing = {row["name"] for row in rows}
+        if not existing:
+            problems.append(f"缺少表 {table}")
+            continue
+        problems.extend(
+            f"缺少列 {table}.{column}"
+            for column in model._meta.fields_db_projection.values() if column not in existing
+        )
+
+    rows = await conn.execute_query_dict("SELECT name FROM sqlite_master WHERE type = 'index'")
+    indexes = {row["name"] for row in rows}
+    expected = _INDEX_NAME.findall(get_schema_sql(conn, safe=True))
+    problems.extend(f"缺少索引 {name}" for name in expected if name not in indexes)
+    return problems
+
+
+async def migrate(connection_name: str = "default") -> List[int]:
+    """离线迁移命令的实现：执行待执行迁移，同步全文索引和触发器，
+    校验模型与数据库一致后记录版本和指纹。返回本次执行的版本号"""
+    applied = await apply_migrations(connection_name)
+    await init_sqlite_schema(connection_name)
+
+    problems = await schema_drift(connection_name)
+    if problems:
+        raise SchemaOutOfDateError("模型与迁移不一致，请在 MIGRATIONS 中追加迁移: " + "; ".join(problems))
+
+    conn = connections.get(connection_name)
+    await conn.execute_query(
+        'INSERT INTO "schema_version" ("id", "version", "fingerprint", "migrated_at") VALUES (1, ?, ?, ?) '
+        'ON CONFLICT("id") DO UPDATE SET "version" = excluded."version", '
+        '"fingerprint" = excluded."fingerprint", "migrated_at" = excluded."migrated_at"',
+        [LATEST_VERSION, schema_fingerprint(), _now()]
+    )
+    return applied
+
+
+async def ensure_schema(auto_migrate: bool, connection_name: str = "default") -> Optional[List[int]]:
+    """启动时调用：版本和指纹都与代码一致时只有一次单行查询，返回 None。
+    不一致时 auto_migrate 为 True 则就地迁移并返回执行的版本号，否则抛出 SchemaOutOfDateError"""
+    state = await get_schema_state(connection_name)
+    if state == (LATEST_VERSION, schema_fingerprint()):
+        return None
+    if state is not None and state[0] > LATEST_VERSION:
+        raise SchemaOutOfDateError(f"数据库结构版本 {state[0]} 比代码（{LATEST_VERSION}）新，请部署新版本代码")
+    if not auto_migrate:
+        version = state[0] if state else "未初始化"
+        raise SchemaOutOfDateError(
+            f"数据库结构版本 {version} 与代码（{LATEST_VERSION}）不一致，请先运行 python migrate.py"
+        )
+    return await migrate(connection_name)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
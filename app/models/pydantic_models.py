@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Dict, Literal
 from datetime import datetime
 
 # 用户模型
@@ -38,9 +38,27 @@ class FeedbackUpdate(BaseModel):
     content: Optional[str] = Field(None, example="新反馈内容")
     status: Optional[str] = Field(None, example="resolved")
 
+class FeedbackImportRow(FeedbackCreate):
+    status: str = Field("pending", example="pending")
+    created_at: Optional[datetime] = Field(None, example="2023-01-01T00:00:00")
+    tags: List[str] = Field(default_factory=list, example=["bug", "feature"])
+
 class FeedbackStatusUpdate(BaseModel):
     status: str = Field(..., example="resolved")
 
+class FeedbackTagBatch(BaseModel):
+    feedback_ids: List[int] = Field(..., min_length=1, max_length=1000, example=[1, 2])
+    tag_names: List[str] = Field(..., max_length=100, example=["bug", "ui"])
+    # add：追加；remove：移除；set：替换为给定标签
+    mode: Literal["add", "remove", "set"] = Field(default="add", example="add")
+
+class FeedbackTagBatchResult(BaseModel):
+    feedback_ids: List[int] = Field(..., example=[1, 2])
+    added: int = Field(..., example=3)
+    removed: int = Field(..., example=1)
+    missing_feedback_ids: List[int] = Field(default_factory=list, example=[])
+    missing_tags: List[str] = Field(default_factory=list, example=[])
+
 class Feedback(FeedbackBase):
     id: int = Field(..., example=1)
     status: str = Field(..., example="pending")
@@ -71,6 +89,9 @@ class Comment(CommentBase):
     class Config:
         from_attributes = True
 
+class CommentWithAuthor(Comment):
+    author_name: Optional[str] = Field(None, example="张三")
+
 # 标签模型
 class TagBase(BaseModel):
     name: str = Field(..., example="bug")
@@ -107,6 +128,10 @@ class Notification(NotificationBase):
     class Config:
         from_attributes = True
 
+class UnreadCount(BaseModel):
+    user_id: int = Field(..., example=1)
+    unread_count: int = Field(..., example=3)
+
 # 统计模型
 class UserStats(BaseModel):
     total_users: int = Field(..., example=100)
@@ -118,6 +143,7 @@ class FeedbackStats(BaseModel):
     in_progress: int = Field(..., example=100)
     resolved: int = Field(..., example=30)
     closed: int = Field(..., example=20)
+    by_status: Dict[str, int] = Field(default_factory=dict, example={"pending": 50, "in_progress": 100})
 
 class HotTag(BaseModel):
     name: str = Field(..., example="bug")
@@ -127,6 +153,41 @@ class FeedbackTrend(BaseModel):
     date: str = Field(..., example="2023-01-01")
     count: int = Field(..., example=10)
 
+class CacheStats(BaseModel):
+    name: str = Field(..., example="user")
+    size: int = Field(..., example=120)
+    max_size: int = Field(..., example=10000)
+    ttl_seconds: float = Field(..., example=60.0)
+    hits: int = Field(..., example=950)
+    misses: int = Field(..., example=50)
+    evictions: int = Field(..., example=0)
+    hit_rate: float = Field(..., example=0.95)
+
+class NotificationWriteStats(BaseModel):
+    enabled: bool = Field(..., example=True)
+    queue_depth: int = Field(..., example=0)
+    max_queue: int = Field(..., example=10000)
+    flushes: int = Field(..., example=120)
+    writes: int = Field(..., example=4800)
+    failures: int = Field(..., example=0)
+    last_batch_size: int = Field(..., example=40)
+    avg_batch_size: float = Field(..., example=40.0)
+    last_flush_ms: float = Field(..., example=3.2)
+    avg_flush_ms: float = Field(..., example=2.9)
+    max_flush_ms: float = Field(..., example=12.5)
+
+# 批量导入模型
+class ImportRowError(BaseModel):
+    line: int = Field(..., example=3)
+    error: str = Field(..., example="用户不存在")
+
+class ImportResult(BaseModel):
+    imported: int = Field(..., example=998)
+    failed: int = Field(..., example=2)
+    errors: List[ImportRowError] = Field(default_factory=list)
+    elapsed_seconds: float = Field(..., example=1.25)
+    rows_per_second: float = Field(..., example=798.4)
+
 # 响应模型
 class MessageResponse(BaseModel):
     message: str = Field(..., example="操作成功")
@@ -134,14 +195,24 @@ class MessageResponse(BaseModel):
 class UserListResponse(BaseModel):
     users: List[User] = Field(...)
     total: int = Field(..., example=10)
+    next_cursor: Optional[str] = Field(None, example="WyIyMDIzLTAxLTAxVDAwOjAwOjAwIiwxXQ")
 
 class FeedbackListResponse(BaseModel):
     feedbacks: List[Feedback] = Field(...)
     total: int = Field(..., example=20)
+    next_cursor: Optional[str] = Field(None, example="WyIyMDIzLTAxLTAxVDAwOjAwOjAwIiwxXQ")
+
+class FeedbackDetail(Feedback):
+    # 未在 include 中选择的部分为 None，响应中省略
+    tags: Optional[List[str]] = Field(None, example=["bug"])
+    comments: Optional[List[CommentWithAuthor]] = Field(None)
+    comments_next_cursor: Optional[str] = Field(None, example="WyIyMDIzLTAxLTAxVDAwOjAwOjAwIiwxXQ")
+    comment_count: Optional[int] = Field(None, example=5)
 
 class CommentListResponse(BaseModel):
     comments: List[Comment] = Field(...)
     total: int = Field(..., example=5)
+    next_cursor: Optional[str] = Field(None, example="WyIyMDIzLTAxLTAxVDAwOjAwOjAwIiwxXQ")
 
 class TagListResponse(BaseModel):
     tags: List[Tag] = Field(...)
@@ -151,3 +222,4 @@ class NotificationListResponse(BaseModel):
     notifications: List[Notification] = Field(...)
     total: int = Field(..., example=5)
     unread_count: int = Field(..., example=3)
+    next_cursor: Optional[str] = Field(None, example="WyIyMDIzLTAxLTAxVDAwOjAwOjAwIiwxXQ")
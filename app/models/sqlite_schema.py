@@ -0,0 +1,275 @@
+from typing import List
+
+from tortoise import connections
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+
+
+# 反馈全文索引：external content 表，由 feedbacks 上的触发器同步。
+# trigram 分词不依赖空格切词，中文和英文都按子串匹配（关键词至少 3 个字符，
+# 2 个字符的关键词走下面的二元组索引）。
+FEEDBACK_FTS_TABLE = "feedbacks_fts"
+FEEDBACK_FTS_MIN_KEYWORD_LENGTH = 3
+
+FEEDBACK_FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS feedbacks_fts USING fts5(
+    title, content,
+    content='feedbacks', content_rowid='id',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS feedbacks_fts_ai AFTER INSERT ON feedbacks BEGIN
+    INSERT INTO feedbacks_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedbacks_fts_ad AFTER DELETE ON feedbacks BEGIN
+    INSERT INTO feedbacks_fts(feedbacks_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedbacks_fts_au AFTER UPDATE OF title, content ON feedbacks BEGIN
+    INSERT INTO feedbacks_fts(feedbacks_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO feedbacks_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+"""
+
+# 2 个字符的关键词（如“登录”“支付”）trigram 无法索引，另建二元组索引：触发器把标题和正文
+# 拆成相邻的两个字符、以空格连接后写入无内容（contentless）的 FTS5 表，unicode61 按空格
+# 切分，每个二元组就是一个词元。json_each 用来生成 0..n-2 的位置序列。
+# contentless 表删除时须提供与写入时相同的文本，触发器按 old 值重新生成。
+FEEDBACK_BIGRAM_TABLE = "feedbacks_bigram"
+FEEDBACK_BIGRAM_KEYWORD_LENGTH = 2
+
+
+def _bigrams(column: str) -> str:
+    positions = f"'[' || rtrim(replace(hex(zeroblob(max(length({column}) - 1, 0))), '00', '0,'), ',') || ']'"
+    return f"(SELECT group_concat(substr({column}, key + 1, 2), ' ') FROM json_each({positions}))"
+
+
+FEEDBACK_BIGRAM_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS feedbacks_bigram USING fts5(
+    title, content,
+    content='',
+    tokenize='unicode61 remove_diacritics 0'
+);
+
+CREATE TRIGGER IF NOT EXISTS feedbacks_bigram_ai AFTER INSERT ON feedbacks BEGIN
+    INSERT INTO feedbacks_bigram(rowid, title, content)
+    VALUES (new.id, {_bigrams("new.title")}, {_bigrams("new.content")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedbacks_bigram_ad AFTER DELETE ON feedbacks BEGIN
+    INSERT INTO feedbacks_bigram(feedbacks_bigram, rowid, title, content)
+    VALUES ('delete', old.id, {_bigrams("old.title")}, {_bigrams("old.content")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedbacks_bigram_au AFTER UPDATE OF title, content ON feedbacks BEGIN
+    INSERT INTO feedbacks_bigram(feedbacks_bigram, rowid, title, content)
+    VALUES ('delete', old.id, {_bigrams("old.title")}, {_bigrams("old.content")});
+    INSERT INTO feedbacks_bigram(rowid, title, content)
+    VALUES (new.id, {_bigrams("new.title")}, {_bigrams("new.content")});
+END;
+"""
+
+FEEDBACK_BIGRAM_REBUILD = [
+    f"INSERT INTO feedbacks_bigram(rowid, title, content) "
+    f"SELECT id, {_bigrams('title')}, {_bigrams('content')} FROM feedbacks",
+]
+
+# 按状态计数的反馈计数器：触发器与 feedbacks 的写入处于同一事务，
+# 因此删除用户时级联删除的反馈也会被扣减。
+FEEDBACK_STATUS_COUNTS_SQL = """
+CREATE TRIGGER IF NOT EXISTS feedback_status_counts_ai AFTER INSERT ON feedbacks BEGIN
+    INSERT INTO feedback_status_counts(status, count) VALUES (new.status, 1)
+    ON CONFLICT(status) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedback_status_counts_ad AFTER DELETE ON feedbacks BEGIN
+    UPDATE feedback_status_counts SET count = count - 1 WHERE status = old.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedback_status_counts_au AFTER UPDATE OF status ON feedbacks
+WHEN old.status IS NOT new.status BEGIN
+    UPDATE feedback_status_counts SET count = count - 1 WHERE status = old.status;
+    INSERT INTO feedback_status_counts(status, count) VALUES (new.status, 1)
+    ON CONFLICT(status) DO UPDATE SET count = count + 1;
+END;
+"""
+
+FEEDBACK_STATUS_COUNTS_REBUILD = [
+    "DELETE FROM feedback_status_counts",
+    "INSERT INTO feedback_status_counts(status, count) "
+    "SELECT status, COUNT(*) FROM feedbacks GROUP BY status",
+]
+
+# 标签使用次数：只在关联行真正插入或删除时加减，与写入处于同一事务。
+# 删除反馈时级联删除的关联行同样会扣减。
+TAG_USAGE_COUNTS_SQL = """
+CREATE TRIGGER IF NOT EXISTS tag_usage_counts_ai AFTER INSERT ON feedback_tags BEGIN
+    UPDATE tags SET usage_count = usage_count + 1 WHERE id = new.tag_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tag_usage_counts_ad AFTER DELETE ON feedback_tags BEGIN
+    UPDATE tags SET usage_count = usage_count - 1 WHERE id = old.tag_id;
+END;
+"""
+
+TAG_USAGE_COUNTS_REBUILD = [
+    "UPDATE tags SET usage_count = c.cnt FROM ("
+    "SELECT t.id AS tag_id, COUNT(ft.id) AS cnt FROM tags t "
+    "LEFT JOIN feedback_tags ft ON ft.tag_id = t.id GROUP BY t.id"
+    ") AS c WHERE c.tag_id = tags.id AND tags.usage_count != c.cnt",
+]
+
+# 每个用户的未读通知数：新增、已读状态变化、删除都在同一语句事务内调整。
+USER_NOTIFICATION_COUNTS_SQL = """
+CREATE TRIGGER IF NOT EXISTS user_notification_counts_ai AFTER INSERT ON notifications
+WHEN new.is_read = 0 BEGIN
+    INSERT INTO user_notification_counts(user_id, unread_count) VALUES (new.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_notification_counts_ad AFTER DELETE ON notifications
+WHEN old.is_read = 0 BEGIN
+    UPDATE user_notification_counts SET unread_count = unread_count - 1 WHERE user_id = old.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_notification_counts_au AFTER UPDATE OF is_read ON notifications
+WHEN old.is_read IS NOT new.is_read BEGIN
+    INSERT INTO user_notification_counts(user_id, unread_count)
+    VALUES (new.user_id, CASE WHEN new.is_read = 0 THEN 1 ELSE -1 END)
+    ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_notification_counts_user_ad AFTER DELETE ON users BEGIN
+    DELETE FROM user_notification_counts WHERE user_id = old.id;
+END;
+"""
+
+USER_NOTIFICATION_COUNTS_REBUILD = [
+    "DELETE FROM user_notification_counts",
+    "INSERT INTO user_notification_counts(user_id, unread_count) "
+    "SELECT user_id, COUNT(*) FROM notifications WHERE is_read = 0 GROUP BY user_id",
+]
+
+# 按天汇总的反馈数量。日期边界随 STATS_UTC_OFFSET_MINUTES 变化，
+# 触发器名带上偏移量，配置变更后启动时会重建触发器并回填汇总表。
+FEEDBACK_DAILY_COUNTS_TRIGGER_PREFIX = "feedback_daily_counts_"
+
+FEEDBACK_DAILY_COUNTS_SQL = """
+CREATE TRIGGER IF NOT EXISTS feedback_daily_counts_ai_{suffix} AFTER INSERT ON feedbacks BEGIN
+    INSERT INTO feedback_daily_counts(day, count) VALUES (date(new.created_at, '{modifier}'), 1)
+    ON CONFLICT(day) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedback_daily_counts_ad_{suffix} AFTER DELETE ON feedbacks BEGIN
+    UPDATE feedback_daily_counts SET count = count - 1 WHERE day = date(old.created_at, '{modifier}');
+END;
+
+CREATE TRIGGER IF NOT EXISTS feedback_daily_counts_au_{suffix} AFTER UPDATE OF created_at ON feedbacks
+WHEN old.created_at IS NOT new.created_at BEGIN
+    UPDATE feedback_daily_counts SET count = count - 1 WHERE day = date(old.created_at, '{modifier}');
+    INSERT INTO feedback_daily_counts(day, count) VALUES (date(new.created_at, '{modifier}'), 1)
+    ON CONFLICT(day) DO UPDATE SET count = count + 1;
+END;
+"""
+
+FEEDBACK_DAILY_COUNTS_REBUILD = [
+    "DELETE FROM feedback_daily_counts",
+    "INSERT INTO feedback_daily_counts(day, count) "
+    "SELECT date(created_at, '{modifier}') AS day, COUNT(*) FROM feedbacks GROUP BY day",
+]
+
+
+def day_modifier(offset_minutes: int) -> str:
+    """SQLite date() 的时区偏移修饰符，如 '+480 minutes'"""
+    return f"{offset_minutes:+d} minutes"
+
+
+def _daily_counts_suffix(offset_minutes: int) -> str:
+    return f"m{-offset_minutes}" if offset_minutes < 0 else str(offset_minutes)
+
+
+async def _object_exists(conn, name: str) -> bool:
+    rows = await conn.execute_query_dict(
+        "SELECT name FROM sqlite_master WHERE name = ?", [name]
+    )
+    return bool(rows)
+
+
+async def init_sqlite_schema(connection_name: str = "default") -> None:
+    """创建 ORM 模型之外的 SQLite 对象（全文索引、触发器），需在 generate_schemas 之后调用"""
+    conn = connections.get(connection_name)
+
+    fts_exists = await _object_exists(conn, FEEDBACK_FTS_TABLE)
+    await conn.execute_script(FEEDBACK_FTS_SQL)
+    if not fts_exists:
+        # 已有数据的库首次建索引时需要全量回填
+        await conn.execute_script("INSERT INTO feedbacks_fts(feedbacks_fts) VALUES ('rebuild');")
+
+    bigram_exists = await _object_exists(conn, FEEDBACK_BIGRAM_TABLE)
+    await conn.execute_script(FEEDBACK_BIGRAM_SQL)
+    if not bigram_exists:
+        await _run_in_transaction(connection_name, FEEDBACK_BIGRAM_REBUILD)
+
+    counters_exist = await _object_exists(conn, "feedback_status_counts_ai")
+    await conn.execute_script(FEEDBACK_STATUS_COUNTS_SQL)
+    if not counters_exist:
+        await _run_in_transaction(connection_name, FEEDBACK_STATUS_COUNTS_REBUILD)
+
+    tag_counts_exist = await _object_exists(conn, "tag_usage_counts_ai")
+    await conn.execute_script(TAG_USAGE_COUNTS_SQL)
+    if not tag_counts_exist:
+        await _run_in_transaction(connection_name, TAG_USAGE_COUNTS_REBUILD)
+
+    unread_counts_exist = await _object_exists(conn, "user_notification_counts_ai")
+    await conn.execute_script(USER_NOTIFICATION_COUNTS_SQL)
+    if not unread_counts_exist:
+        await _run_in_transaction(connection_name, USER_NOTIFICATION_COUNTS_REBUILD)
+
+    offset = settings.STATS_UTC_OFFSET_MINUTES
+    suffix = _daily_counts_suffix(offset)
+    if not await _object_exists(conn, f"feedback_daily_counts_ai_{suffix}"):
+        stale = await conn.execute_query_dict(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?",
+            [FEEDBACK_DAILY_COUNTS_TRIGGER_PREFIX + "%"]
+        )
+        for row in stale:
+            name = row["name"]
+            await conn.execute_script(f'DROP TRIGGER IF EXISTS "{name}";')
+        await conn.execute_script(
+            FEEDBACK_DAILY_COUNTS_SQL.format(suffix=suffix, modifier=day_modifier(offset))
+        )
+        await rebuild_feedback_daily_counts(connection_name)
+
+
+async def rebuild_feedback_status_counts(connection_name: str = "default") -> None:
+    """用一次 GROUP BY 重算状态计数器，用于修复漂移"""
+    await _run_in_transaction(connection_name, FEEDBACK_STATUS_COUNTS_REBUILD)
+
+
+async def rebuild_tag_usage_counts(connection_name: str = "default") -> None:
+    """用一条 UPDATE ... FROM 重算所有标签的使用次数"""
+    await _run_in_transaction(connection_name, TAG_USAGE_COUNTS_REBUILD)
+
+
+async def rebuild_user_notification_counts(connection_name: str = "default") -> None:
+    """按 notifications 现状重算所有用户的未读数"""
+    await _run_in_transaction(connection_name, USER_NOTIFICATION_COUNTS_REBUILD)
+
+
+async def rebuild_feedback_daily_counts(connection_name: str = "default") -> None:
+    """按当前时区偏移重算每日汇总表"""
+    modifier = day_modifier(settings.STATS_UTC_OFFSET_MINUTES)
+    await _run_in_transaction(
+        connection_name,
+        [statement.format(modifier=modifier) for statement in FEEDBACK_DAILY_COUNTS_REBUILD]
+    )
+
+
+async def _run_in_transaction(connection_name: str, statements: List[str]) -> None:
+    async with in_transaction(connection_name) as conn:
+        for statement in statements:
+            await conn.execute_query(statement)
@@ -4,6 +4,9 @@ from tortoise import Tortoise
 from datetime import datetime
 from typing import Optional, List
 
+from app.core.config import settings
+from app.models.migrations import migrate
+
 
 class User(Model):
     id = fields.IntField(pk=True)
@@ -20,6 +23,7 @@ class User(Model):
     
     class Meta:
         table = "users"
+        indexes = (("created_at", "id"),)
 
 
 class Feedback(Model):
@@ -31,13 +35,32 @@ class Feedback(Model):
     updated_at = fields.DatetimeField(auto_now=True)
     
     user: fields.ForeignKeyRelation[User] = fields.ForeignKeyField(
-        "models.User", related_name="feedbacks", on_delete=fields.CASCADE
+        "models.User", related_name="feedbacks", on_delete=fields.CASCADE, index=True
     )
     comments: fields.ReverseRelation["Comment"]
     feedback_tags: fields.ReverseRelation["FeedbackTag"]
     
     class Meta:
         table = "feedbacks"
+        indexes = (("created_at", "id"), ("status", "created_at", "id"))
+
+
+class FeedbackStatusCount(Model):
+    """按状态汇总的反馈数量，由 feedbacks 上的触发器维护"""
+    status = fields.CharField(max_length=20, pk=True)
+    count = fields.IntField(default=0)
+    
+    class Meta:
+        table = "feedback_status_counts"
+
+
+class FeedbackDailyCount(Model):
+    """按天汇总的反馈数量（day 为 STATS_UTC_OFFSET_MINUTES 时区下的日期），由触发器维护"""
+    day = fields.CharField(max_length=10, pk=True)
+    count = fields.IntField(default=0)
+    
+    class Meta:
+        table = "feedback_daily_counts"
 
 
 class Comment(Model):
@@ -47,7 +70,7 @@ class Comment(Model):
     updated_at = fields.DatetimeField(auto_now=True)
     
     user: fields.ForeignKeyRelation[User] = fields.ForeignKeyField(
-        "models.User", related_name="comments", on_delete=fields.CASCADE
+        "models.User", related_name="comments", on_delete=fields.CASCADE, index=True
     )
     feedback: fields.ForeignKeyRelation[Feedback] = fields.ForeignKeyField(
         "models.Feedback", related_name="comments", on_delete=fields.CASCADE
@@ -55,6 +78,7 @@ class Comment(Model):
     
     class Meta:
         table = "comments"
+        indexes = (("feedback_id", "created_at", "id"),)
 
 
 class Tag(Model):
@@ -62,7 +86,7 @@ class Tag(Model):
     name = fields.CharField(max_length=50, unique=True, index=True)
     description = fields.CharField(max_length=200, null=True)
     created_at = fields.DatetimeField(auto_now_add=True)
-    usage_count = fields.IntField(default=0)
+    usage_count = fields.IntField(default=0, index=True)
     
     feedback_tags: fields.ReverseRelation["FeedbackTag"]
     
@@ -83,6 +107,7 @@ class FeedbackTag(Model):
     class Meta:
         table = "feedback_tags"
         unique_together = ("feedback", "tag")
+        indexes = (("tag_id", "feedback_id"),)
 
 
 class Notification(Model):
@@ -98,16 +123,21 @@ class Notification(Model):
     
     class Meta:
         table = "notifications"
+        indexes = (("user_id", "created_at", "id"), ("user_id", "is_read", "created_at"))
+
+
+class UserNotificationCount(Model):
+    """每个用户的未读通知数，由 notifications 上的触发器维护"""
+    user_id = fields.IntField(pk=True)
+    unread_count = fields.IntField(default=0)
+    
+    class Meta:
+        table = "user_notification_counts"
 
 
 async def init_db(db_url: str = "sqlite://./feedback.db"):
-    await Tortoise.init(
-        db_url=db_url,
-        modules={
-            "models": ["app.models.tortoise_models"]
-        }
-    )
-    await Tortoise.generate_schemas()
+    await Tortoise.init(config=settings.tortoise_config(db_url))
+    await migrate()
 
 
 async def close_db():
@@ -4,6 +4,8 @@ from app.services.comment_service import CommentService
 from app.services.tag_service import TagService
 from app.services.notification_service import NotificationService
 from app.services.stats_service import StatsService
+from app.services.import_service import ImportService
+from app.services.export_service import ExportService
 
 __all__ = [
     "UserService",
@@ -11,5 +13,7 @@ __all__ = [
     "CommentService",
     "TagService",
     "NotificationService",
-    "StatsService"
+    "StatsService",
+    "ImportService",
+    "ExportService"
 ]
\ No newline at end of file
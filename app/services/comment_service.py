@@ -1,12 +1,14 @@
 from typing import Optional, List
 from app.models.tortoise_models import Comment, Feedback
 from app.models.pydantic_models import CommentCreate
+from app.core.pagination import KEYSET_ORDERING, keyset_filter
+from app.services.feedback_service import FeedbackService
 
 
 class CommentService:
     @staticmethod
     async def create_comment(comment_data: CommentCreate) -> Comment:
-        feedback = await Feedback.get_or_none(id=comment_data.feedback_id)
+        feedback = await FeedbackService.get_feedback_header(comment_data.feedback_id)
         if not feedback:
             return None
         
@@ -22,8 +24,23 @@ class CommentService:
         return await Comment.get_or_none(id=comment_id)
     
     @staticmethod
-    async def get_comments(feedback_id: int, skip: int = 0, limit: int = 100) -> List[Comment]:
-        return await Comment.filter(feedback_id=feedback_id).offset(skip).limit(limit).order_by("-created_at")
+    async def get_comments(
+        feedback_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[Comment]:
+        query = Comment.filter(feedback_id=feedback_id)
+        if cursor:
+            query = query.filter(keyset_filter(cursor))
+        else:
+            query = query.offset(skip)
+        return await query.limit(limit).order_by(*KEYSET_ORDERING)
+    
+    @staticmethod
+    async def get_comments_with_authors(feedback_id: int, limit: int = 20) -> List[Comment]:
+        """第一页评论，联表带出作者（comment.user），一次查询"""
+        return await Comment.filter(feedback_id=feedback_id).select_related("user").limit(limit).order_by(*KEYSET_ORDERING)
     
     @staticmethod
     async def get_comments_count(feedback_id: int) -> int:
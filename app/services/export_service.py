@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Any
+
+from app.core.config import settings
+from app.models.tortoise_models import Feedback, Comment
+from app.services.feedback_service import FeedbackService
+
+EXPORT_FIELDS = ["id", "title", "content", "status", "user_id", "created_at", "updated_at"]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ExportService:
+    @staticmethod
+    async def iter_feedback_chunks(
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        include_comments: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """按主键游标分块读取反馈，每块一次性取回标签和评论，内存只与块大小有关"""
+        last_id = 0
+        while True:
+            query = Feedback.filter(id__gt=last_id)
+            if status:
+                query = query.filter(status=status)
+            if created_from:
+                query = query.filter(created_at__gte=created_from)
+            if created_to:
+                query = query.filter(created_at__lt=created_to)
+
+            records = await query.order_by("id").limit(settings.EXPORT_CHUNK_SIZE).values(*EXPORT_FIELDS)
+            if not records:
+                return
+
+            ids = [record["id"] for record in records]
+            tags_map = await FeedbackService._get_feedback_tags_batch(ids)
+            comments_map: Dict[int, List[Dict[str, Any]]] = {}
+            if include_comments:
+                comments_map = await ExportService._get_comments_batch(ids)
+
+            for record in records:
+                record["tags"] = tags_map[record["id"]]
+                if include_comments:
+                    record["comments"] = comments_map.get(record["id"], [])
+
+            yield records
+            last_id = ids[-1]
+
+    @staticmethod
+    async def export_ndjson(**filters) -> AsyncIterator[bytes]:
+        async for records in ExportService.iter_feedback_chunks(**filters):
+            yield "".join(
+                json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+                for record in records
+            ).encode()
+
+    @staticmethod
+    async def export_csv(include_comments: bool = False, **filters) -> AsyncIterator[bytes]:
+        columns = EXPORT_FIELDS + ["tags"] + (["comments"] if include_comments else [])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+
+        async for records in ExportService.iter_feedback_chunks(include_comments=include_comments, **filters):
+            for record in records:
+                row = [record[field] for field in EXPORT_FIELDS]
+                row[EXPORT_FIELDS.index("created_at")] = record["created_at"].isoformat()
+                row[EXPORT_FIELDS.index("updated_at")] = record["updated_at"].isoformat()
+                row.append("|".join(record["tags"]))
+                if include_comments:
+                    row.append(json.dumps(record["comments"], ensure_ascii=False, default=_json_default))
+                writer.writerow(row)
+
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    async def _get_comments_batch(feedback_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        comments = await Comment.filter(feedback_id__in=feedback_ids).order_by(
+            "feedback_id", "created_at", "id"
+        ).values("id", "feedback_id", "user_id", "content", "created_at")
+
+        comments_map: Dict[int, List[Dict[str, Any]]] = {}
+        for comment in comments:
+            comments_map.setdefault(comment.pop("feedback_id"), []).append(comment)
+        return comments_map
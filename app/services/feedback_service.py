@@ -1,8 +1,23 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
+from tortoise import connections
 from tortoise.functions import Count
 from tortoise.queryset import Q
-from app.models.tortoise_models import Feedback, FeedbackTag, Tag
-from app.models.pydantic_models import FeedbackCreate, FeedbackUpdate
+from tortoise.transactions import in_transaction
+from app.models.tortoise_models import Feedback, FeedbackStatusCount, FeedbackTag, Tag
+from app.models.sqlite_schema import (
+    FEEDBACK_BIGRAM_KEYWORD_LENGTH, FEEDBACK_BIGRAM_TABLE, FEEDBACK_FTS_MIN_KEYWORD_LENGTH, FEEDBACK_FTS_TABLE
+)
+from app.models.pydantic_models import (
+    FeedbackCreate, FeedbackUpdate, FeedbackTagBatchResult, Feedback as FeedbackSchema
+)
+from app.core.pagination import KEYSET_ORDERING, keyset_filter
+from app.core.serialization import fetch_rows
+from app.core.cache import feedback_cache
+from app.core.response_cache import data_versions
+from app.services.tag_service import TagService
+
+# 列表接口直接从行元组构造响应，列顺序与响应模型的字段顺序一致
+FEEDBACK_LIST_FIELDS = tuple(name for name in FeedbackSchema.model_fields if name != "tags")
 
 
 class FeedbackService:
@@ -14,52 +29,108 @@ class FeedbackService:
             user_id=feedback_data.user_id,
             status="pending"
         )
+        data_versions.bump("feedback")
         return feedback
     
     @staticmethod
-    async def get_feedback(feedback_id: int) -> Optional[Feedback]:
+    async def get_feedback(feedback_id: int, with_tags: bool = True) -> Optional[Feedback]:
+        """从数据库读取最新的反馈行，with_tags 为 True 时再用一次查询填充 tags"""
         feedback = await Feedback.get_or_none(id=feedback_id)
-        if feedback:
-            feedback.tags = await FeedbackService._get_feedback_tags(feedback.id)
+        if feedback and with_tags:
+            await FeedbackService._load_tags([feedback])
         return feedback
     
+    @staticmethod
+    async def get_feedback_header(feedback_id: int) -> Optional[Feedback]:
+        """不带标签的反馈行（走缓存），用于存在性检查，调用方不应修改返回对象。
+        
+        缓存按进程保存，多 worker 时可能比数据库旧一个 TTL，不要用它的字段组装响应"""
+        return await feedback_cache.get_or_load(feedback_id, lambda: Feedback.get_or_none(id=feedback_id))
+    
     @staticmethod
     async def get_feedback_list(
         skip: int = 0, 
         limit: int = 100, 
-        status: Optional[str] = None
-    ) -> List[Feedback]:
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """返回可直接编码的 dict 行（含 tags），不构造模型实例"""
         query = Feedback.all()
         if status:
             query = query.filter(status=status)
+        if cursor:
+            query = query.filter(keyset_filter(cursor))
+        else:
+            query = query.offset(skip)
         
-        feedbacks = await query.offset(skip).limit(limit).order_by("-created_at")
-        
+        feedbacks = await fetch_rows(query.limit(limit).order_by(*KEYSET_ORDERING), FEEDBACK_LIST_FIELDS)
+        tags_map = await FeedbackService._get_feedback_tags_batch([feedback["id"] for feedback in feedbacks])
         for feedback in feedbacks:
-            feedback.tags = await FeedbackService._get_feedback_tags(feedback.id)
-        
+            feedback["tags"] = tags_map[feedback["id"]]
         return feedbacks
     
     @staticmethod
     async def get_feedback_count(status: Optional[str] = None) -> int:
-        query = Feedback.all()
+        """读取触发器维护的按状态计数，不做 COUNT(*) 扫描"""
+        query = FeedbackStatusCount.all()
         if status:
             query = query.filter(status=status)
-        return await query.count()
+        counts = await query.values_list("count", flat=True)
+        return sum(counts)
     
     @staticmethod
     async def search_feedback(keyword: str, skip: int = 0, limit: int = 100) -> List[Feedback]:
-        query = Feedback.filter(
-            Q(title__icontains=keyword) | Q(content__icontains=keyword)
-        )
-        
-        feedbacks = await query.offset(skip).limit(limit).order_by("-created_at")
-        
-        for feedback in feedbacks:
-            feedback.tags = await FeedbackService._get_feedback_tags(feedback.id)
+        fts = FeedbackService._fts_match(keyword)
+        if fts is None:
+            feedbacks = await FeedbackService._scan_search_query(keyword).offset(skip).limit(limit).order_by("-created_at")
+        else:
+            table, match = fts
+            # 标题命中的权重高于正文
+            rows = await connections.get("default").execute_query_dict(
+                f"SELECT rowid AS id FROM {table} WHERE {table} MATCH ? "
+                f"ORDER BY bm25({table}, 2.0, 1.0), rowid DESC LIMIT ? OFFSET ?",
+                [match, limit, skip]
+            )
+            ids = [row["id"] for row in rows]
+            feedback_map = {fb.id: fb for fb in await Feedback.filter(id__in=ids)} if ids else {}
+            feedbacks = [feedback_map[i] for i in ids if i in feedback_map]
         
+        await FeedbackService._load_tags(feedbacks)
         return feedbacks
     
+    @staticmethod
+    async def search_feedback_count(keyword: str) -> int:
+        fts = FeedbackService._fts_match(keyword)
+        if fts is None:
+            return await FeedbackService._scan_search_query(keyword).count()
+        
+        table, match = fts
+        rows = await connections.get("default").execute_query_dict(
+            f"SELECT COUNT(*) AS total FROM {table} WHERE {table} MATCH ?",
+            [match]
+        )
+        return rows[0]["total"]
+    
+    @staticmethod
+    def _fts_match(keyword: str) -> Optional[Tuple[str, str]]:
+        """把关键词转成 (全文索引表, FTS5 短语查询)。3 个字符及以上用 trigram 索引；
+        恰好 2 个字母、数字或汉字用二元组索引（含标点的二元组会被 unicode61 切开）；
+        其余（单个字符等）返回 None 走扫描"""
+        keyword = keyword.strip()
+        if len(keyword) >= FEEDBACK_FTS_MIN_KEYWORD_LENGTH:
+            table = FEEDBACK_FTS_TABLE
+        elif len(keyword) == FEEDBACK_BIGRAM_KEYWORD_LENGTH and keyword.isalnum():
+            table = FEEDBACK_BIGRAM_TABLE
+        else:
+            return None
+        return table, '"' + keyword.replace('"', '""') + '"'
+    
+    @staticmethod
+    def _scan_search_query(keyword: str):
+        return Feedback.filter(
+            Q(title__icontains=keyword) | Q(content__icontains=keyword)
+        )
+    
     @staticmethod
     async def update_feedback(feedback_id: int, update_data: FeedbackUpdate) -> Optional[Feedback]:
         feedback = await Feedback.get_or_none(id=feedback_id)
@@ -71,7 +142,9 @@ class FeedbackService:
             setattr(feedback, field, value)
         
         await feedback.save()
-        feedback.tags = await FeedbackService._get_feedback_tags(feedback.id)
+        feedback_cache.invalidate(feedback_id)
+        data_versions.bump("feedback")
+        await FeedbackService._load_tags([feedback])
         return feedback
     
     @staticmethod
@@ -82,7 +155,9 @@ class FeedbackService:
         
         feedback.status = status
         await feedback.save()
-        feedback.tags = await FeedbackService._get_feedback_tags(feedback.id)
+        feedback_cache.invalidate(feedback_id)
+        data_versions.bump("feedback")
+        await FeedbackService._load_tags([feedback])
         return feedback
     
     @staticmethod
@@ -92,45 +167,137 @@ class FeedbackService:
             return False
         
         await feedback.delete()
+        feedback_cache.invalidate(feedback_id)
+        # 级联删除的标签关联会改变标签使用次数
+        data_versions.bump("feedback", "tag")
         return True
     
     @staticmethod
     async def add_tag_to_feedback(feedback_id: int, tag_name: str) -> bool:
-        feedback = await Feedback.get_or_none(id=feedback_id)
+        feedback = await FeedbackService.get_feedback_header(feedback_id)
         if not feedback:
             return False
         
-        tag = await Tag.get_or_none(name=tag_name)
+        tag = await TagService.get_tag_by_name(tag_name)
         if not tag:
             return False
         
-        await FeedbackTag.get_or_create(feedback_id=feedback_id, tag_id=tag.id)
-        
-        tag.usage_count += 1
-        await tag.save()
-        
+        # usage_count 由 feedback_tags 上的触发器维护，已存在的关联不会重复计数
+        _, created = await FeedbackTag.get_or_create(feedback_id=feedback_id, tag_id=tag.id)
+        if created:
+            data_versions.bump("tag")
         return True
     
     @staticmethod
     async def remove_tag_from_feedback(feedback_id: int, tag_name: str) -> bool:
-        feedback = await Feedback.get_or_none(id=feedback_id)
+        feedback = await FeedbackService.get_feedback_header(feedback_id)
         if not feedback:
             return False
         
-        tag = await Tag.get_or_none(name=tag_name)
+        tag = await TagService.get_tag_by_name(tag_name)
         if not tag:
             return False
         
-        feedback_tag = await FeedbackTag.get_or_none(feedback_id=feedback_id, tag_id=tag.id)
-        if feedback_tag:
-            await feedback_tag.delete()
-            if tag.usage_count > 0:
-                tag.usage_count -= 1
-                await tag.save()
-        
+        if await FeedbackTag.filter(feedback_id=feedback_id, tag_id=tag.id).delete():
+            data_versions.bump("tag")
         return True
     
     @staticmethod
-    async def _get_feedback_tags(feedback_id: int) -> List[str]:
-        feedback_tags = await FeedbackTag.filter(feedback_id=feedback_id).prefetch_related("tag")
-        return [ft.tag.name for ft in feedback_tags]
+    async def batch_update_tags(feedback_ids: List[int], tag_names: List[str], mode: str = "add") -> FeedbackTagBatchResult:
+        """为一批反馈追加（add）、移除（remove）或替换（set）一组标签，在一个事务内完成。
+        
+        标签名和反馈 id 各用一次查询解析；有不存在的反馈或标签时不做任何修改。
+        存在性检查与写入在同一事务内，检查之后被删除的反馈或标签不会留下悬空关联。
+        usage_count 由 feedback_tags 上的触发器按实际插入/删除的行调整。
+        """
+        feedback_ids = list(dict.fromkeys(feedback_ids))
+        tag_names = list(dict.fromkeys(tag_names))
+        
+        async with in_transaction() as connection:
+            # 先取得写锁再读：WAL 下读过旧快照的延迟事务无法再升级为写
+            await connection.execute_query("UPDATE sqlite_sequence SET seq = seq WHERE name = 'feedback_tags'")
+            tag_rows = await Tag.filter(name__in=tag_names).using_db(connection).values_list("name", "id") if tag_names else []
+            tag_ids_by_name = dict(tag_rows)
+            existing_ids = set(await Feedback.filter(id__in=feedback_ids).using_db(connection).values_list("id", flat=True))
+            result = FeedbackTagBatchResult(
+                feedback_ids=feedback_ids,
+                added=0,
+                removed=0,
+                missing_feedback_ids=[i for i in feedback_ids if i not in existing_ids],
+                missing_tags=[name for name in tag_names if name not in tag_ids_by_name]
+            )
+            if result.missing_feedback_ids or result.missing_tags:
+                return result
+            
+            tag_ids = [tag_ids_by_name[name] for name in tag_names]
+            if mode in ("remove", "set"):
+                result.removed = await FeedbackService._delete_tag_links(connection, feedback_ids, tag_ids, keep=(mode == "set"))
+            if mode in ("add", "set") and tag_ids:
+                result.added = await FeedbackService._insert_tag_links(connection, feedback_ids, tag_ids)
+        
+        if result.added or result.removed:
+            data_versions.bump("tag")
+        return result
+    
+    @staticmethod
+    async def _insert_tag_links(connection, feedback_ids: List[int], tag_ids: List[int]) -> int:
+        """INSERT OR IGNORE 批量插入关联，已存在的关联由唯一约束跳过，返回实际插入行数"""
+        pairs = [(feedback_id, tag_id) for feedback_id in feedback_ids for tag_id in tag_ids]
+        inserted = 0
+        # 每条语句的绑定参数数保持在 SQLite 上限以内
+        for start in range(0, len(pairs), 5000):
+            chunk = pairs[start:start + 5000]
+            await connection.execute_query(
+                "INSERT OR IGNORE INTO feedback_tags (feedback_id, tag_id) VALUES "
+                + ", ".join(["(?, ?)"] * len(chunk)),
+                [value for pair in chunk for value in pair]
+            )
+            inserted += await FeedbackService._last_changes(connection)
+        return inserted
+    
+    @staticmethod
+    async def _delete_tag_links(connection, feedback_ids: List[int], tag_ids: List[int], keep: bool) -> int:
+        """keep=False 删除给定标签的关联；keep=True 删除给定标签以外的关联"""
+        sql = f"DELETE FROM feedback_tags WHERE feedback_id IN ({', '.join(['?'] * len(feedback_ids))})"
+        values = list(feedback_ids)
+        if tag_ids:
+            operator = "NOT IN" if keep else "IN"
+            sql += f" AND tag_id {operator} ({', '.join(['?'] * len(tag_ids))})"
+            values.extend(tag_ids)
+        elif not keep:
+            return 0
+        await connection.execute_query(sql, values)
+        return await FeedbackService._last_changes(connection)
+    
+    @staticmethod
+    async def _last_changes(connection) -> int:
+        # changes() 只统计上一条语句本身修改的行，不含触发器产生的修改
+        rows = await connection.execute_query_dict("SELECT changes() AS changes")
+        return rows[0]["changes"]
+    
+    @staticmethod
+    async def get_feedback_tags(feedback_id: int) -> List[str]:
+        tags_map = await FeedbackService._get_feedback_tags_batch([feedback_id])
+        return tags_map.get(feedback_id, [])
+    
+    @staticmethod
+    async def _get_feedback_tags_batch(feedback_ids: List[int]) -> Dict[int, List[str]]:
+        """一次联表查询取回一批反馈的标签，返回 feedback_id -> 标签名列表"""
+        tags_map: Dict[int, List[str]] = {feedback_id: [] for feedback_id in feedback_ids}
+        if not feedback_ids:
+            return tags_map
+        
+        # 在 Python 中按关联 id 排序（保持添加顺序），SQL 里 ORDER BY id 会额外建临时排序树
+        rows = await FeedbackTag.filter(
+            feedback_id__in=feedback_ids
+        ).values_list("id", "feedback_id", "tag__name")
+        for _, feedback_id, tag_name in sorted(rows):
+            tags_map[feedback_id].append(tag_name)
+        return tags_map
+    
+    @staticmethod
+    async def _load_tags(feedbacks: List[Feedback]) -> None:
+        """为一页反馈填充 tags 属性，查询次数与页大小无关"""
+        tags_map = await FeedbackService._get_feedback_tags_batch([fb.id for fb in feedbacks])
+        for feedback in feedbacks:
+            feedback.tags = tags_map[feedback.id]
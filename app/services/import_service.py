@@ -0,0 +1,171 @@
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+from app.core.response_cache import data_versions
+from app.models.tortoise_models import Tag, User
+from app.models.pydantic_models import FeedbackImportRow, ImportResult, ImportRowError
+
+
+class _ImportState:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[ImportRowError] = []
+
+    def fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append(ImportRowError(line=line, error=error))
+
+
+class ImportService:
+    @staticmethod
+    async def import_feedback_ndjson(chunks: AsyncIterator[bytes]) -> ImportResult:
+        """逐行读取 NDJSON 并按 IMPORT_CHUNK_SIZE 分事务写入，内存占用与上传大小无关"""
+        started = time.perf_counter()
+        state = _ImportState()
+        batch: List[Tuple[int, FeedbackImportRow]] = []
+
+        async for line_no, line in ImportService._iter_lines(chunks, state):
+            if not line.strip():
+                continue
+            try:
+                row = FeedbackImportRow.model_validate_json(line)
+            except ValidationError as exc:
+                state.fail(line_no, ImportService._format_validation_error(exc))
+                continue
+
+            batch.append((line_no, row))
+            if len(batch) >= settings.IMPORT_CHUNK_SIZE:
+                await ImportService._write_batch(batch, state)
+                batch = []
+
+        if batch:
+            await ImportService._write_batch(batch, state)
+
+        elapsed = time.perf_counter() - started
+        return ImportResult(
+            imported=state.imported,
+            failed=state.failed,
+            errors=state.errors,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(state.imported / elapsed, 1) if elapsed > 0 else 0.0
+        )
+
+    @staticmethod
+    async def _iter_lines(
+        chunks: AsyncIterator[bytes], state: _ImportState
+    ) -> AsyncIterator[Tuple[int, bytes]]:
+        buffer = b""
+        line_no = 0
+        skipping = False
+        async for chunk in chunks:
+            lines = (buffer + chunk).split(b"\n")
+            buffer = lines.pop()
+            for line in lines:
+                line_no += 1
+                if skipping:
+                    skipping = False
+                    continue
+                yield line_no, line
+
+            if len(buffer) > settings.IMPORT_MAX_LINE_BYTES and not skipping:
+                state.fail(line_no + 1, "行长度超过限制")
+                skipping = True
+            if skipping:
+                # 丢弃超长行的剩余部分，直到下一个换行
+                buffer = b""
+
+        if buffer and not skipping:
+            yield line_no + 1, buffer
+
+    @staticmethod
+    async def _write_batch(batch: List[Tuple[int, FeedbackImportRow]], state: _ImportState) -> None:
+        user_ids = {row.user_id for _, row in batch}
+        existing_users = set(await User.filter(id__in=user_ids).values_list("id", flat=True))
+
+        rows: List[Tuple[int, FeedbackImportRow]] = []
+        for line_no, row in batch:
+            if row.user_id not in existing_users:
+                state.fail(line_no, "用户不存在")
+            else:
+                rows.append((line_no, row))
+        if not rows:
+            return
+
+        try:
+            async with in_transaction() as conn:
+                # Tortoise 发出的是延迟 BEGIN，第一条写语句之前不持有写锁。先执行一条
+                # 不改变数据的写语句取得写锁（其他连接按 busy_timeout 等待），之后按
+                # sqlite_sequence 连续分配主键才不会与其他进程冲突，无需逐行 RETURNING
+                # 就能写入标签关联。必须放在所有读之前：WAL 下读过旧快照的事务无法再升级为写。
+                await conn.execute_query("UPDATE sqlite_sequence SET seq = seq WHERE name = 'feedbacks'")
+                tag_ids = await ImportService._resolve_tags(conn, rows)
+
+                seq_rows = await conn.execute_query_dict(
+                    "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'feedbacks'), 0), "
+                    "COALESCE((SELECT MAX(id) FROM feedbacks), 0)) AS last_id"
+                )
+                next_id = seq_rows[0]["last_id"] + 1
+
+                now = datetime.now(timezone.utc)
+                feedback_values = []
+                link_values = []
+                for offset, (_, row) in enumerate(rows):
+                    feedback_id = next_id + offset
+                    created_at = ImportService._to_utc(row.created_at) if row.created_at else now
+                    feedback_values.append([
+                        feedback_id, row.title, row.content, row.status, created_at, now, row.user_id
+                    ])
+                    for name in set(row.tags):
+                        link_values.append([feedback_id, tag_ids[name]])
+
+                await conn.execute_many(
+                    "INSERT INTO feedbacks (id, title, content, status, created_at, updated_at, user_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    feedback_values
+                )
+                if link_values:
+                    await conn.execute_many(
+                        "INSERT OR IGNORE INTO feedback_tags (feedback_id, tag_id) VALUES (?, ?)",
+                        link_values
+                    )
+        except Exception as exc:
+            for line_no, _ in rows:
+                state.fail(line_no, f"写入失败: {exc}")
+            return
+
+        state.imported += len(rows)
+        data_versions.bump("feedback", "tag")
+
+    @staticmethod
+    async def _resolve_tags(conn, rows: List[Tuple[int, FeedbackImportRow]]) -> Dict[str, int]:
+        """一个分块内的标签名只解析一次，不存在的标签自动创建"""
+        names = {name for _, row in rows for name in row.tags}
+        if not names:
+            return {}
+
+        tag_ids = dict(await Tag.filter(name__in=names).using_db(conn).values_list("name", "id"))
+        missing = names - tag_ids.keys()
+        if missing:
+            await Tag.bulk_create([Tag(name=name) for name in missing], ignore_conflicts=True, using_db=conn)
+            tag_ids.update(await Tag.filter(name__in=missing).using_db(conn).values_list("name", "id"))
+        return tag_ids
+
+    @staticmethod
+    def _to_utc(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+    @staticmethod
+    def _format_validation_error(exc: ValidationError) -> str:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in exc.errors()
+        )
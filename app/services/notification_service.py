@@ -1,20 +1,45 @@
-from typing import Optional, List
-from app.models.tortoise_models import Notification, User
-from app.models.pydantic_models import NotificationCreate
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any
+from app.models.tortoise_models import Notification, UserNotificationCount
+from app.models.sqlite_schema import rebuild_user_notification_counts
+from app.models.pydantic_models import NotificationCreate, Notification as NotificationSchema
+from app.core.notification_hub import notification_hub
+from app.services.notification_writer import notification_writer
+from app.services.user_service import UserService
+from app.core.pagination import KEYSET_ORDERING, keyset_filter
+from app.core.serialization import fetch_rows
+
+logger = logging.getLogger("app.notifications")
+
+# 列表接口直接从行元组构造响应，列顺序与响应模型的字段顺序一致
+NOTIFICATION_LIST_FIELDS = tuple(NotificationSchema.model_fields)
 
 
 class NotificationService:
     @staticmethod
     async def create_notification(notification_data: NotificationCreate) -> Notification:
-        user = await User.get_or_none(id=notification_data.user_id)
+        user = await UserService.get_user(notification_data.user_id)
         if not user:
             return None
         
-        notification = await Notification.create(
-            user_id=notification_data.user_id,
-            title=notification_data.title,
-            content=notification_data.content
-        )
+        fields = {
+            "user_id": notification_data.user_id,
+            "title": notification_data.title,
+            "content": notification_data.content,
+        }
+        if notification_writer.running:
+            notification = await notification_writer.create(**fields)
+        else:
+            notification = await Notification.create(**fields)
+        if notification_hub.has_subscribers(notification.user_id):
+            notification_hub.publish(
+                notification.user_id,
+                "notification",
+                NotificationSchema.model_validate(notification).model_dump(mode="json"),
+                event_id=notification.id
+            )
+            await NotificationService._publish_unread_count(notification.user_id)
         return notification
     
     @staticmethod
@@ -22,32 +47,84 @@ class NotificationService:
         return await Notification.get_or_none(id=notification_id)
     
     @staticmethod
-    async def get_user_notifications(user_id: int, skip: int = 0, limit: int = 100) -> List[Notification]:
-        return await Notification.filter(user_id=user_id).offset(skip).limit(limit).order_by("-created_at")
+    async def get_user_notifications(
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """返回可直接编码的 dict 行，不构造模型实例"""
+        query = Notification.filter(user_id=user_id)
+        if cursor:
+            query = query.filter(keyset_filter(cursor))
+        else:
+            query = query.offset(skip)
+        return await fetch_rows(query.limit(limit).order_by(*KEYSET_ORDERING), NOTIFICATION_LIST_FIELDS)
     
     @staticmethod
     async def get_user_notifications_count(user_id: int, unread_only: bool = False) -> int:
-        query = Notification.filter(user_id=user_id)
         if unread_only:
-            query = query.filter(is_read=False)
-        return await query.count()
+            return await NotificationService.get_unread_count(user_id)
+        return await Notification.filter(user_id=user_id).count()
+    
+    @staticmethod
+    async def get_unread_count(user_id: int) -> int:
+        """读取触发器维护的未读计数，单行主键查询"""
+        counts = await UserNotificationCount.filter(user_id=user_id).values_list("unread_count", flat=True)
+        return counts[0] if counts else 0
+    
+    @staticmethod
+    async def reconcile_unread_counts() -> None:
+        await rebuild_user_notification_counts()
+    
+    @staticmethod
+    async def run_reconcile_loop(interval_seconds: int) -> None:
+        """后台任务：定期校准未读计数，修复可能的漂移；单次失败（如数据库繁忙）记录后等下一轮"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await NotificationService.reconcile_unread_counts()
+            except Exception:
+                logger.exception("未读通知计数校准失败，%s 秒后重试", interval_seconds)
     
     @staticmethod
     async def mark_notification_as_read(notification_id: int) -> bool:
-        notification = await Notification.get_or_none(id=notification_id)
-        if not notification:
-            return False
+        if notification_writer.running:
+            result = await notification_writer.mark_read(notification_id)
+            if result is None:
+                return False
+            user_id, was_unread = result
+        else:
+            notification = await Notification.get_or_none(id=notification_id)
+            if not notification:
+                return False
+            
+            user_id, was_unread = notification.user_id, not notification.is_read
+            notification.is_read = True
+            await notification.save()
         
-        notification.is_read = True
-        await notification.save()
+        if was_unread:
+            await NotificationService._publish_unread_count(user_id)
         return True
     
     @staticmethod
     async def mark_all_notifications_as_read(user_id: int) -> bool:
         updated_count = await Notification.filter(user_id=user_id, is_read=False).update(is_read=True)
+        if updated_count:
+            await NotificationService._publish_unread_count(user_id)
         return updated_count > 0
     
     @staticmethod
     async def clear_all_notifications(user_id: int) -> bool:
         deleted_count = await Notification.filter(user_id=user_id).delete()
+        if deleted_count:
+            await NotificationService._publish_unread_count(user_id)
         return deleted_count > 0
+    
+    @staticmethod
+    async def _publish_unread_count(user_id: int) -> None:
+        """有推送连接时才查询并推送最新未读数"""
+        if not notification_hub.has_subscribers(user_id):
+            return
+        unread_count = await NotificationService.get_unread_count(user_id)
+        notification_hub.publish(user_id, "unread_count", {"user_id": user_id, "unread_count": unread_count})
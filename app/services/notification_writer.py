@@ -0,0 +1,211 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+from app.models.tortoise_models import Notification
+
+_CREATE = "create"
+_MARK_READ = "mark_read"
+_STOP = object()
+
+
+class _WriteOp:
+    __slots__ = ("kind", "payload", "future")
+
+    def __init__(self, kind: str, payload: Any, future: asyncio.Future):
+        self.kind = kind
+        self.payload = payload
+        self.future = future
+
+
+class NotificationWriter:
+    """通知写入的组提交（write-behind）队列。
+
+    创建通知和标记已读先进入有界队列，后台写入任务攒够 max_batch 条或等待
+    flush_interval 后在一个事务里提交，多次写入共用一次提交/fsync。调用方
+    仍会等待自己所在批次提交完成，拿到的结果与直接写入一致。整批失败时
+    逐条重试，只有出错的那条写入失败。未启动时 running 为 False，调用方直接写库。
+    """
+
+    def __init__(self, max_batch: int, flush_interval: float, max_queue: int):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.flushes = 0
+        self.writes = 0
+        self.failures = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._closed = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = self._closed = False
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止接收新写入，并把队列中已有的写入全部提交"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        self._stopping = True
+        await self._queue.put(_STOP)
+        await task
+
+    async def create(self, **fields) -> Notification:
+        return await self._submit(_CREATE, fields)
+
+    async def mark_read(self, notification_id: int) -> Optional[Tuple[int, bool]]:
+        """返回 (user_id, 此前是否未读)，通知不存在时返回 None"""
+        return await self._submit(_MARK_READ, notification_id)
+
+    async def _submit(self, kind: str, payload: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        op = _WriteOp(kind, payload, future)
+        if self._stopping:
+            return await self._write_now(op)
+        # 队列满时在此等待，形成反压
+        await self._queue.put(op)
+        if self._closed and not future.done():
+            # 在 put 上等待期间写入任务已排空退出，这条写入不会再被处理
+            return await self._write_now(op)
+        return await future
+
+    @staticmethod
+    async def _write_now(op: _WriteOp) -> Any:
+        """停止过程中到达的写入不再入队，单独提交"""
+        async with in_transaction() as connection:
+            results = await NotificationWriter._apply([op], connection)
+        return results[0]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            op = await self._queue.get()
+            if op is _STOP:
+                break
+            batch = [op]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        op = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    op = self._queue.get_nowait()
+                if op is _STOP:
+                    stopping = True
+                    break
+                batch.append(op)
+            await self._flush(batch)
+
+        # 停止标记之后仍可能有写入入队（包括此前在 put 上等待的调用方），
+        # 每次提交后重新检查，直到队列保持为空
+        while not self._queue.empty():
+            leftover = []
+            while not self._queue.empty() and len(leftover) < self.max_batch:
+                op = self._queue.get_nowait()
+                if op is not _STOP:
+                    leftover.append(op)
+            if leftover:
+                await self._flush(leftover)
+        # 与上面的空队列检查之间没有 await，此后入队的写入由 _submit 自行提交
+        self._closed = True
+
+    async def _flush(self, batch: List[_WriteOp]) -> None:
+        started = time.perf_counter()
+        try:
+            async with in_transaction() as connection:
+                results: List[Any] = await self._apply(batch, connection)
+        except Exception:
+            results = []
+            for op in batch:
+                try:
+                    async with in_transaction() as connection:
+                        results.extend(await self._apply([op], connection))
+                except Exception as exc:
+                    self.failures += 1
+                    results.append(exc)
+
+        for op, result in zip(batch, results):
+            if op.future.done():
+                continue
+            if isinstance(result, Exception):
+                op.future.set_exception(result)
+            else:
+                op.future.set_result(result)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.writes += len(batch)
+        self.last_batch_size = len(batch)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    @staticmethod
+    async def _apply(batch: List[_WriteOp], connection) -> List[Any]:
+        """在同一事务中执行一批写入，结果与 batch 一一对应"""
+        results: Dict[int, Any] = {}
+        read_ops = []
+        for index, op in enumerate(batch):
+            if op.kind == _CREATE:
+                results[index] = await Notification.create(using_db=connection, **op.payload)
+            else:
+                read_ops.append((index, op.payload))
+
+        if read_ops:
+            ids = {notification_id for _, notification_id in read_ops}
+            rows = await Notification.filter(id__in=ids).using_db(connection).values_list("id", "user_id", "is_read")
+            state = {row_id: (user_id, not is_read) for row_id, user_id, is_read in rows}
+            unread_ids = [row_id for row_id, (_, unread) in state.items() if unread]
+            if unread_ids:
+                await Notification.filter(id__in=unread_ids).using_db(connection).update(is_read=True)
+            for index, notification_id in read_ops:
+                results[index] = state.get(notification_id)
+
+        return [results[index] for index in range(len(batch))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.running,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "flushes": self.flushes,
+            "writes": self.writes,
+            "failures": self.failures,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_size": round(self.writes / self.flushes, 2) if self.flushes else 0.0,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+
+notification_writer = NotificationWriter(
+    max_batch=settings.NOTIFICATION_WRITE_BATCH_SIZE,
+    flush_interval=settings.NOTIFICATION_WRITE_FLUSH_INTERVAL_MS / 1000,
+    max_queue=settings.NOTIFICATION_WRITE_QUEUE_SIZE,
+)
@@ -1,7 +1,12 @@
-from typing import List, Dict
-from datetime import datetime, timedelta, date
-from app.models.tortoise_models import Feedback
-from app.models.pydantic_models import UserStats, FeedbackStats, HotTag, FeedbackTrend
+from typing import List, Dict, Tuple
+from datetime import datetime, timedelta, date, timezone
+from app.core.config import settings
+from app.models.tortoise_models import FeedbackStatusCount, FeedbackDailyCount
+from app.models.sqlite_schema import rebuild_feedback_status_counts, rebuild_feedback_daily_counts
+from app.models.pydantic_models import UserStats, FeedbackStats, HotTag, FeedbackTrend, CacheStats, NotificationWriteStats
+from app.core.cache import entity_caches
+from app.core.response_cache import data_versions
+from app.services.notification_writer import notification_writer
 from app.services.user_service import UserService
 from app.services.tag_service import TagService
 
@@ -17,42 +22,67 @@ class StatsService:
     
     @staticmethod
     async def get_feedback_stats() -> FeedbackStats:
-        total = await Feedback.all().count()
-        pending = await Feedback.filter(status="pending").count()
-        in_progress = await Feedback.filter(status="in_progress").count()
-        resolved = await Feedback.filter(status="resolved").count()
-        closed = await Feedback.filter(status="closed").count()
-        
+        rows = await FeedbackStatusCount.all().values_list("status", "count")
+        return StatsService._build_feedback_stats(dict(rows))
+    
+    @staticmethod
+    async def rebuild_feedback_status_counts() -> FeedbackStats:
+        await rebuild_feedback_status_counts()
+        data_versions.bump("feedback")
+        return await StatsService.get_feedback_stats()
+    
+    @staticmethod
+    def _build_feedback_stats(counts: Dict[str, int]) -> FeedbackStats:
+        by_status = {status: count for status, count in counts.items() if count}
         return FeedbackStats(
-            total_feedback=total,
-            pending=pending,
-            in_progress=in_progress,
-            resolved=resolved,
-            closed=closed
+            total_feedback=sum(by_status.values()),
+            pending=by_status.get("pending", 0),
+            in_progress=by_status.get("in_progress", 0),
+            resolved=by_status.get("resolved", 0),
+            closed=by_status.get("closed", 0),
+            by_status=by_status
         )
     
+    @staticmethod
+    def get_cache_stats() -> List[CacheStats]:
+        return [CacheStats(**cache.stats()) for cache in entity_caches]
+    
+    @staticmethod
+    def get_notification_write_stats() -> NotificationWriteStats:
+        return NotificationWriteStats(**notification_writer.stats())
+    
     @staticmethod
     async def get_hot_tags(limit: int = 10) -> List[HotTag]:
         return await TagService.get_hot_tags(limit)
     
     @staticmethod
     async def get_feedback_trend(days: int = 30) -> List[FeedbackTrend]:
+        """从每日汇总表读取趋势，读取行数只与天数有关"""
+        start, end = StatsService._trend_window(days)
+        rows = await FeedbackDailyCount.filter(
+            day__gte=start.isoformat(),
+            day__lte=end.isoformat()
+        ).values_list("day", "count")
+        return StatsService._fill_trend(start, days, dict(rows))
+    
+    @staticmethod
+    async def rebuild_feedback_daily_counts() -> None:
+        await rebuild_feedback_daily_counts()
+        data_versions.bump("feedback")
+    
+    @staticmethod
+    def _stats_timezone() -> timezone:
+        return timezone(timedelta(minutes=settings.STATS_UTC_OFFSET_MINUTES))
+    
+    @staticmethod
+    def _trend_window(days: int) -> Tuple[date, date]:
+        today = datetime.now(StatsService._stats_timezone()).date()
+        return today - timedelta(days=days - 1), today
+    
+    @staticmethod
+    def _fill_trend(start: date, days: int, counts: Dict[str, int]) -> List[FeedbackTrend]:
         trend = []
-        today = date.today()
-        
         for i in range(days):
-            trend_date = today - timedelta(days=i)
-            date_str = trend_date.strftime("%Y-%m-%d")
-            
-            start_datetime = datetime.combine(trend_date, datetime.min.time())
-            end_datetime = datetime.combine(trend_date, datetime.max.time())
-            
-            count = await Feedback.filter(
-                created_at__gte=start_datetime,
-                created_at__lte=end_datetime
-            ).count()
-            
-            trend.append(FeedbackTrend(date=date_str, count=count))
-        
-        trend.reverse()
+            date_str = (start + timedelta(days=i)).strftime("%Y-%m-%d")
+            trend.append(FeedbackTrend(date=date_str, count=counts.get(date_str, 0)))
         return trend
@@ -1,5 +1,8 @@
 from typing import Optional, List, Dict
 from app.models.tortoise_models import Tag, FeedbackTag
+from app.models.sqlite_schema import rebuild_tag_usage_counts
+from app.core.cache import tag_cache
+from app.core.response_cache import data_versions
 from app.models.pydantic_models import TagCreate, HotTag
 
 
@@ -13,15 +16,18 @@ class TagService:
         if not created and tag_data.description:
             tag.description = tag_data.description
             await tag.save()
+            TagService._invalidate(tag)
+        if created or tag_data.description:
+            data_versions.bump("tag")
         return tag
     
     @staticmethod
     async def get_tag(tag_id: int) -> Optional[Tag]:
-        return await Tag.get_or_none(id=tag_id)
+        return await tag_cache.get_or_load(("id", tag_id), lambda: Tag.get_or_none(id=tag_id))
     
     @staticmethod
     async def get_tag_by_name(name: str) -> Optional[Tag]:
-        return await Tag.get_or_none(name=name)
+        return await tag_cache.get_or_load(("name", name), lambda: Tag.get_or_none(name=name))
     
     @staticmethod
     async def get_tags(skip: int = 0, limit: int = 100) -> List[Tag]:
@@ -39,6 +45,8 @@ class TagService:
         
         await FeedbackTag.filter(tag_id=tag_id).delete()
         await tag.delete()
+        TagService._invalidate(tag)
+        data_versions.bump("tag")
         return True
     
     @staticmethod
@@ -49,8 +57,10 @@ class TagService:
     
     @staticmethod
     async def refresh_tag_usage_counts() -> None:
-        tags = await Tag.all()
-        for tag in tags:
-            count = await FeedbackTag.filter(tag_id=tag.id).count()
-            tag.usage_count = count
-            await tag.save()
+        await rebuild_tag_usage_counts()
+        tag_cache.clear()
+        data_versions.bump("tag")
+    
+    @staticmethod
+    def _invalidate(tag: Tag) -> None:
+        tag_cache.invalidate(("id", tag.id), ("name", tag.name))
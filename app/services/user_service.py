@@ -1,26 +1,32 @@
 from typing import Optional, List, Dict, Any
-from passlib.context import CryptContext
+from app.core.cache import user_cache, feedback_cache
+from app.core.response_cache import data_versions
+from app.core.security import pwd_context, password_hasher
 from app.models.tortoise_models import User
-from app.models.pydantic_models import UserCreate, UserUpdate
+from app.models.pydantic_models import UserCreate, UserUpdate, User as UserSchema
+from app.core.pagination import KEYSET_ORDERING, keyset_filter
+from app.core.serialization import fetch_rows
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 列表接口直接从行元组构造响应，列顺序与响应模型的字段顺序一致
+USER_LIST_FIELDS = tuple(UserSchema.model_fields)
 
 
 class UserService:
     @staticmethod
     async def create_user(user_data: UserCreate) -> User:
-        password_hash = pwd_context.hash(user_data.password)
+        password_hash = await password_hasher.hash(user_data.password)
         user = await User.create(
             username=user_data.username,
             email=user_data.email,
             name=user_data.name,
             password_hash=password_hash
         )
+        data_versions.bump("user")
         return user
     
     @staticmethod
     async def get_user(user_id: int) -> Optional[User]:
-        return await User.get_or_none(id=user_id)
+        return await user_cache.get_or_load(user_id, lambda: User.get_or_none(id=user_id))
     
     @staticmethod
     async def get_user_by_username(username: str) -> Optional[User]:
@@ -31,8 +37,14 @@ class UserService:
         return await User.get_or_none(email=email)
     
     @staticmethod
-    async def get_users(skip: int = 0, limit: int = 100) -> List[User]:
-        return await User.all().offset(skip).limit(limit)
+    async def get_users(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """返回可直接编码的 dict 行，不读取 password_hash"""
+        query = User.all()
+        if cursor:
+            query = query.filter(keyset_filter(cursor))
+        else:
+            query = query.offset(skip)
+        return await fetch_rows(query.limit(limit).order_by(*KEYSET_ORDERING), USER_LIST_FIELDS)
     
     @staticmethod
     async def get_users_count() -> int:
@@ -46,12 +58,14 @@ class UserService:
         
         update_dict = update_data.model_dump(exclude_unset=True)
         if "password" in update_dict:
-            update_dict["password_hash"] = pwd_context.hash(update_dict.pop("password"))
+            update_dict["password_hash"] = await password_hasher.hash(update_dict.pop("password"))
         
         for field, value in update_dict.items():
             setattr(user, field, value)
         
         await user.save()
+        user_cache.invalidate(user_id)
+        data_versions.bump("user")
         return user
     
     @staticmethod
@@ -61,6 +75,10 @@ class UserService:
             return False
         
         await user.delete()
+        user_cache.invalidate(user_id)
+        # 用户的反馈被级联删除
+        feedback_cache.clear()
+        data_versions.bump("user", "feedback", "tag")
         return True
     
     @staticmethod
@@ -72,6 +90,6 @@ class UserService:
         user = await UserService.get_user_by_username(username)
         if not user:
             return None
-        if not UserService.verify_password(password, user.password_hash):
+        if not await password_hasher.verify(password, user.password_hash):
             return None
         return user
\ No newline at end of file
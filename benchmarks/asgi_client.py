@@ -0,0 +1,157 @@
+import asyncio
+import json
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlencode
+
+
+class Response:
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class ASGIClient:
+    """进程内直接调用 ASGI 应用的最小客户端，基准测量不经过网络栈"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Any = None,
+        content: bytes = b"",
+        headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        raw_headers: List[Tuple[bytes, bytes]] = [
+            (key.lower().encode(), value.encode()) for key, value in (headers or {}).items()
+        ]
+        if json_body is not None:
+            content = json.dumps(json_body).encode()
+            raw_headers.append((b"content-type", b"application/json"))
+        raw_headers.append((b"content-length", str(len(content)).encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urlencode(params or {}).encode(),
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if body_sent:
+                return {"type": "http.disconnect"}
+            body_sent = True
+            return {"type": "http.request", "body": content, "more_body": False}
+
+        status_code = 500
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+
+        async def send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for key, value in message.get("headers", []):
+                    response_headers[key.decode().lower()] = value.decode()
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return Response(status_code, response_headers, b"".join(chunks))
+
+    async def get(self, path: str, **kwargs) -> Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> Response:
+        return await self.request("POST", path, **kwargs)
+
+
+class StreamHandle:
+    """长连接响应（如 SSE）：响应体分块放入 chunks 队列，close() 模拟客户端断开"""
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+        self.chunks: "asyncio.Queue[bytes]" = asyncio.Queue()
+        self.started = asyncio.Event()
+        self.paused = False
+        self._resume = asyncio.Event()
+        self._disconnect = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def read_until(self, marker: bytes, timeout: float = 10.0) -> bytes:
+        """读取直到某个分块包含 marker，返回该分块"""
+        while True:
+            chunk = await asyncio.wait_for(self.chunks.get(), timeout)
+            if marker in chunk:
+                return chunk
+
+    async def close(self) -> None:
+        self._disconnect.set()
+        self._resume.set()
+        if self._task:
+            await self._task
+
+
+async def open_stream(app, path: str, paused: bool = False) -> StreamHandle:
+    """打开一个流式 GET 请求并等待响应头；paused=True 时客户端不读取响应体（模拟慢消费者）"""
+    handle = StreamHandle()
+    handle.paused = paused
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await handle._disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            handle.status_code = message["status"]
+            handle.started.set()
+        elif message["type"] == "http.response.body":
+            if handle.paused:
+                await handle._resume.wait()
+            if message.get("body"):
+                handle.chunks.put_nowait(message["body"])
+
+    async def run():
+        try:
+            await app(scope, receive, send)
+        finally:
+            handle.started.set()
+
+    handle._task = asyncio.create_task(run())
+    await handle.started.wait()
+    return handle
@@ -0,0 +1,98 @@
+"""应用冷启动耗时：启动时建表（generate_schemas + init_sqlite_schema）与只做结构版本检查的对比
+
+    python -m benchmarks.cold_start --size 100k --runs 10
+
+每次启动都在新的 Python 进程中进行，分别测量导入 main、Tortoise.init、结构处理
+三个阶段以及整个进程的耗时，两种方式交替运行，报告中位数和最大值。
+数据库由 benchmarks.generate_data 生成（与 endpoint_latency 共用 --data-dir 缓存），
+测量前先用 migrate.py 迁移到最新版本。文件位于页缓存中，不含磁盘冷读。
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+MODES = ("generate_schemas", "version_check")
+
+
+async def _child(mode: str, db_path: str) -> None:
+    started = time.perf_counter()
+    import main  # noqa: F401  与 uvicorn 加载应用时相同的导入
+    from tortoise import Tortoise
+    from app.core.config import settings
+    from app.models.migrations import ensure_schema
+    from app.models.sqlite_schema import init_sqlite_schema
+
+    imported = time.perf_counter()
+    await Tortoise.init(config=settings.tortoise_config(f"sqlite://{db_path}"))
+    initialized = time.perf_counter()
+    if mode == "generate_schemas":
+        await Tortoise.generate_schemas()
+        await init_sqlite_schema()
+    else:
+        await ensure_schema(auto_migrate=False)
+    finished = time.perf_counter()
+    await Tortoise.close_connections()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "init_ms": (initialized - imported) * 1000,
+        "schema_ms": (finished - initialized) * 1000,
+    }))
+
+
+def run_child(mode: str, db_path: str) -> Dict[str, float]:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child", mode, "--db", db_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="100k", help="数据规模，同 endpoint_latency 的 --sizes")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("/tmp", "fb-bench-data"))
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_child(args.child, args.db))
+        return
+
+    from benchmarks.endpoint_latency import SIZES, ensure_database
+
+    if args.size not in SIZES:
+        parser.error(f"未知规模: {args.size}")
+    os.makedirs(args.data_dir, exist_ok=True)
+    db_path = ensure_database(args.data_dir, args.size, args.seed)
+    subprocess.run([sys.executable, "migrate.py", "--database-url", f"sqlite://{db_path}"], check=True, stdout=subprocess.DEVNULL)
+
+    samples: Dict[str, List[Dict[str, float]]] = {mode: [] for mode in MODES}
+    for _ in range(args.runs):
+        for mode in MODES:
+            samples[mode].append(run_child(mode, db_path))
+
+    print(f"\n{args.size} feedback, {args.runs} runs ({db_path})")
+    print(f"{'mode':<18}" + "".join(f"{phase:>20}" for phase in ("import_ms", "init_ms", "schema_ms", "process_ms")))
+    for mode in MODES:
+        cells = []
+        for phase in ("import_ms", "init_ms", "schema_ms", "process_ms"):
+            values = [sample[phase] for sample in samples[mode]]
+            cells.append(f"{statistics.median(values):>10.1f} / {max(values):>7.1f}")
+        print(f"{mode:<18}" + "".join(cells))
+    print("(median / max, ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""主要读接口的延迟基准与回归检查
+
+    python -m benchmarks.endpoint_latency --sizes 1k,100k
+    python -m benchmarks.endpoint_latency --sizes 1k,100k,1m --save-baseline
+    python -m benchmarks.endpoint_latency --sizes 1k,100k,1m --baseline benchmarks/baselines/endpoint_latency.json
+
+对每个数据规模（反馈行数），用 benchmarks.generate_data 生成（或复用 --data-dir 下已
+生成的）数据库，在进程内通过 ASGI 调用 main.app，对每个接口报告 p50/p95/p99 延迟、
+吞吐量和每次请求的 SQL 条数（来自 X-Query-Count 响应头）。结果写入 --output。
+
+给出 --baseline 时与基线逐项比较 p95：超过 基线 * (1 + 阈值) 且绝对差值大于
+--min-delta-ms 的接口视为回归，进程以状态码 1 退出；指定的基线文件不存在时在测量前
+以状态码 2 退出。阈值取 --threshold，基线文件
+中 thresholds 字段可按接口单独覆盖，例如 {"thresholds": {"search_fts": 0.5}}。
+统计接口的响应缓存在每次请求前清空，测量的是实际计算路径。
+基线与机器相关，应在同一台机器上生成和比较。
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "endpoint_latency.json")
+
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000, "1m": 1000000}
+
+# (名称, 路径, 参数, 是否在每次请求前清空统计响应缓存)
+ROUTES: List[Tuple[str, str, Dict[str, Any], bool]] = [
+    ("feedback_list", "/feedback/", {"limit": 20}, False),
+    ("feedback_list_status", "/feedback/", {"limit": 20, "status": "pending"}, False),
+    ("feedback_list_cursor", "/feedback/", {"limit": 20, "cursor": None}, False),
+    ("feedback_detail", "/feedback/1/detail/", {}, False),
+    ("search_fts", "/feedback/search/", {"keyword": "payment", "limit": 20}, False),
+    ("search_short_keyword", "/feedback/search/", {"keyword": "ui", "limit": 20}, False),
+    ("stats_feedback", "/stats/feedback/", {}, True),
+    ("stats_users", "/stats/users/", {}, True),
+    ("stats_hot_tags", "/stats/hot-tags/", {"limit": 10}, True),
+    ("stats_feedback_trend", "/stats/feedback-trend/", {"days": 30}, True),
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def ensure_database(data_dir: str, size: str, seed: int) -> str:
+    path = os.path.join(data_dir, f"feedback-{size}-seed{seed}.db")
+    if not os.path.exists(path):
+        feedback = SIZES[size]
+        print(f"generating {path} ...", flush=True)
+        subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.generate_data",
+                "--db", path, "--seed", str(seed), "--fixed-end",
+                "--feedback", str(feedback), "--users", str(max(100, feedback // 10)),
+            ],
+            check=True,
+        )
+    return path
+
+
+async def measure_size(db_path: str, requests: int, concurrency: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    from main import app
+    from app.core.cache import entity_caches
+    from app.core.config import settings
+    from app.core.response_cache import stats_response_cache
+    from benchmarks.asgi_client import ASGIClient
+
+    settings.DATABASE_URL = f"sqlite://{db_path}"
+    for cache in entity_caches:
+        cache.clear()
+    stats_response_cache.clear()
+
+    api = settings.API_V1_STR
+    results: Dict[str, Dict[str, float]] = {}
+    async with app.router.lifespan_context(app):
+        client = ASGIClient(app)
+        first_page = (await client.get(f"{api}/feedback/", params={"limit": 20})).json()
+        cursor = first_page["next_cursor"]
+
+        for name, path, params, cold_stats in ROUTES:
+            params = {key: (cursor if key == "cursor" else value) for key, value in params.items()}
+            if "cursor" in params and params["cursor"] is None:
+                continue
+
+            async def call() -> Tuple[float, int, int]:
+                if cold_stats:
+                    stats_response_cache.clear()
+                started = time.perf_counter()
+                response = await client.get(api + path, params=params)
+                return time.perf_counter() - started, response.status_code, int(response.headers.get("x-query-count", -1))
+
+            for _ in range(warmup):
+                await call()
+
+            latencies: List[float] = []
+            queries: List[int] = []
+            statuses = set()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def worker() -> None:
+                async with semaphore:
+                    latency, status, query_count = await call()
+                    latencies.append(latency)
+                    queries.append(query_count)
+                    statuses.add(status)
+
+            started = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(requests)])
+            elapsed = time.perf_counter() - started
+
+            results[name] = {
+                "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+                "rps": round(requests / elapsed, 1),
+                "queries": max(queries),
+                "status": sorted(statuses),
+            }
+    return results
+
+
+def print_results(size: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n== {size} feedback ==")
+    print(f"{'route':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'queries':>9}  status")
+    for name, row in results.items():
+        print(
+            f"{name:<24}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            f"{row['rps']:>10.1f}{row['queries']:>9}  {row['status']}"
+        )
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float
+) -> List[str]:
+    """返回回归描述列表；基线中没有的规模或接口跳过"""
+    overrides: Dict[str, float] = baseline.get("thresholds", {})
+    regressions = []
+    for size, routes in current["results"].items():
+        for name, row in routes.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+            limit = overrides.get(name, threshold)
+            allowed = base["p95_ms"] * (1 + limit)
+            if row["p95_ms"] > allowed and row["p95_ms"] - base["p95_ms"] > min_delta_ms:
+                regressions.append(
+                    f"{size}/{name}: p95 {row['p95_ms']:.2f}ms > baseline {base['p95_ms']:.2f}ms +{limit:.0%}"
+                )
+            if row["queries"] > base["queries"]:
+                regressions.append(f"{size}/{name}: queries {row['queries']} > baseline {base['queries']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k", help=f"逗号分隔，可选 {', '.join(SIZES)}")
+    parser.add_argument("--requests", type=int, default=200, help="每个接口的测量请求数")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("/tmp", "fb-bench-data"))
+    parser.add_argument("--output", default="endpoint_latency.json", help="本次结果的 JSON 文件")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="与基线比较（默认路径见 DEFAULT_BASELINE）")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.25, help="允许的 p95 相对增幅")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="小于该绝对增幅的变化视为噪声")
+    args = parser.parse_args()
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"未知规模: {', '.join(unknown)}")
+    if args.baseline and not os.path.exists(args.baseline):
+        # 明确要求比较时缺少基线视为失败，不能让回归检查悄悄跳过
+        parser.error(f"基线文件不存在: {args.baseline}（先用 --save-baseline 生成）")
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    os.environ["DEBUG_QUERY_HEADERS"] = "true"
+    os.environ.setdefault("NOTIFICATION_RECONCILE_INTERVAL_SECONDS", "0")
+    os.environ.setdefault("SCHEMA_AUTO_MIGRATE", "true")
+    databases = {size: ensure_database(args.data_dir, size, args.seed) for size in sizes}
+
+    current: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        results = asyncio.run(measure_size(databases[size], args.requests, args.concurrency, args.warmup))
+        current["results"][size] = results
+        print_results(size, results)
+
+    with open(args.output, "w") as output:
+        json.dump(current, output, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.save_baseline:
+        previous: Optional[Dict[str, Any]] = None
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline) as existing:
+                previous = json.load(existing)
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        if previous and "thresholds" in previous:
+            current["thresholds"] = previous["thresholds"]
+        with open(args.save_baseline, "w") as output:
+            json.dump(current, output, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(current, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""生成接近生产规模的合成数据库，用于负载测试
+
+    python -m benchmarks.generate_data --db /tmp/fb-large.db --users 100000 --feedback 1000000
+
+在一个新的 SQLite 库里批量写入用户、标签、反馈、标签关联、评论和通知：
+
+- 同一 --seed 加 --fixed-end 生成的数据完全相同；不加 --fixed-end 时时间窗口截止到
+  运行时刻，行内容相同但所有时间戳随运行时间平移
+- 所有用户共用一个预先计算的密码哈希（密码为 --password），不逐个跑 bcrypt
+- 反馈作者、评论作者和标签热度服从 Zipf 分布；每条反馈的评论数、每个用户的
+  通知数服从幂律（Pareto）分布；created_at 均匀分布在最近 --days 天内，id 随时间递增
+- 先只执行版本化迁移（建表和索引），用大事务 executemany 写入；全部写完后再运行
+  migrate 创建全文索引和计数触发器（由 init_sqlite_schema“首次安装即回填”的逻辑
+  一次性重建计数器和索引）并记录结构版本，生成的库可以直接启动应用
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+WORDS = [
+    "登录", "页面", "按钮", "无响应", "崩溃", "加载", "很慢", "支付", "失败", "订单",
+    "通知", "设置", "搜索", "结果", "不准确", "导出", "报表", "权限", "错误", "提示",
+    "login", "page", "button", "crash", "slow", "payment", "order", "search", "export",
+    "report", "permission", "error", "timeout", "upload", "image", "profile", "mobile",
+    "dashboard", "feature", "request", "improve", "dark", "mode", "sync", "offline",
+]
+TAG_NAMES = [
+    "bug", "feature", "improvement", "question", "ui", "performance", "security",
+    "mobile", "payment", "search", "export", "notification", "login", "docs",
+]
+STATUSES = ["pending", "in_progress", "resolved", "closed"]
+STATUS_WEIGHTS = [45, 20, 30, 5]
+BCRYPT_SALT_CHARS = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def zipf_cum_weights(n: int, s: float) -> List[float]:
+    return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def pick(rng: random.Random, cum_weights: Sequence[float]) -> int:
+    """按累积权重抽取下标（0 起）"""
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+
+def power_law_count(rng: random.Random, alpha: float, cap: int) -> int:
+    return min(cap, int(rng.paretovariate(alpha)) - 1)
+
+
+def spread_times(rng: random.Random, count: int, start: datetime, end: datetime) -> Iterator[datetime]:
+    """分层抽样：第 i 个时间落在第 i 个等宽区间内，整体单调递增"""
+    span = (end - start).total_seconds()
+    for i in range(count):
+        yield start + timedelta(seconds=(i + rng.random()) / count * span)
+
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def ts(value: datetime) -> str:
+    # 与 Tortoise 写入 SQLite 的格式一致：'YYYY-MM-DD HH:MM:SS.ffffff+00:00'
+    return str(value)
+
+
+class Loader:
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.totals = {}
+
+    async def write(self, tables: Dict[str, Tuple[Tuple[str, ...], List[tuple]]]) -> None:
+        """在一个事务里写入若干张表的一批行"""
+        from tortoise.transactions import in_transaction
+
+        async with in_transaction() as conn:
+            for table, (columns, rows) in tables.items():
+                if rows:
+                    await conn.execute_many(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                        rows
+                    )
+                self.totals[table] = self.totals.get(table, 0) + len(rows)
+
+    async def insert(self, table: str, columns: Tuple[str, ...], rows: Iterator[tuple]) -> None:
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                break
+            await self.write({table: (columns, batch)})
+
+    def report(self, tables: Sequence[str], started: float) -> None:
+        elapsed = time.perf_counter() - started
+        rows = sum(self.totals.get(table, 0) for table in tables)
+        counts = ", ".join(f"{table}={self.totals.get(table, 0)}" for table in tables)
+        print(f"{counts} in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+async def generate(args: argparse.Namespace) -> None:
+    from tortoise import Tortoise, connections
+    from app.core.config import settings
+    from app.core.security import pwd_context
+    from app.models.migrations import apply_migrations, migrate
+
+    rng = random.Random(args.seed)
+    end = datetime(2026, 1, 1, tzinfo=timezone.utc) if args.fixed_end else datetime.now(timezone.utc)
+    start = end - timedelta(days=args.days)
+    loader = Loader(args.batch_size)
+
+    await Tortoise.init(config=settings.tortoise_config(f"sqlite://{args.db}"))
+    await apply_migrations()
+    conn = connections.get("default")
+    # 一次性装载，崩溃后重新生成即可，关闭同步换取写入速度
+    await conn.execute_script("PRAGMA synchronous = OFF;")
+
+    started = time.perf_counter()
+    # 盐也由种子决定，保证同一种子生成的库完全相同
+    salt = "".join(rng.choices(BCRYPT_SALT_CHARS, k=21)) + rng.choice(".Oeu")
+    password_hash = pwd_context.handler("bcrypt").using(salt=salt).hash(args.password)
+
+    user_times = list(spread_times(rng, args.users, start, end))
+    step = time.perf_counter()
+    await loader.insert(
+        "users",
+        ("id", "username", "email", "name", "password_hash", "created_at", "updated_at"),
+        (
+            (i, f"user{i}", f"user{i}@example.com", f"User {i}", password_hash, ts(t), ts(t))
+            for i, t in enumerate(user_times, start=1)
+        )
+    )
+
+    tag_names = (TAG_NAMES + [f"tag{i}" for i in range(len(TAG_NAMES), args.tags)])[:args.tags]
+    await loader.insert(
+        "tags",
+        ("id", "name", "description", "usage_count", "created_at"),
+        ((i, name, f"{name} 相关反馈", 0, ts(start)) for i, name in enumerate(tag_names, start=1))
+    )
+    loader.report(("users", "tags"), step)
+
+    # 作者与标签热度：排名越靠前越活跃；作者排名打乱到用户 id 上
+    author_weights = zipf_cum_weights(args.users, args.author_skew)
+    author_ids = list(range(1, args.users + 1))
+    rng.shuffle(author_ids)
+    tag_weights = zipf_cum_weights(len(tag_names), args.tag_skew)
+
+    feedback_columns = ("id", "title", "content", "status", "created_at", "updated_at", "user_id")
+    comment_columns = ("id", "content", "created_at", "updated_at", "feedback_id", "user_id")
+    comment_id = itertools.count(1)
+    step = time.perf_counter()
+    feedbacks: List[tuple] = []
+    links: List[tuple] = []
+    comments: List[tuple] = []
+    # 反馈连同它的标签关联和评论按批写入同一事务，内存只保留一批
+    for feedback_id, created in enumerate(spread_times(rng, args.feedback, start, end), start=1):
+        for tag_index in {pick(rng, tag_weights) for _ in range(rng.choice((0, 1, 1, 2, 2, 3)))}:
+            links.append((feedback_id, tag_index + 1))
+        for _ in range(power_law_count(rng, args.comment_alpha, args.max_comments)):
+            at = min(end, created + timedelta(seconds=rng.expovariate(1 / 86400)))
+            comments.append((
+                next(comment_id), sentence(rng, 3, 20), ts(at), ts(at),
+                feedback_id, author_ids[pick(rng, author_weights)]
+            ))
+        status = rng.choices(STATUSES, weights=STATUS_WEIGHTS)[0]
+        feedbacks.append((
+            feedback_id, sentence(rng, 3, 8), sentence(rng, 15, 60), status,
+            ts(created), ts(created), author_ids[pick(rng, author_weights)]
+        ))
+        if len(feedbacks) + len(comments) >= args.batch_size or feedback_id == args.feedback:
+            await loader.write({
+                "feedbacks": (feedback_columns, feedbacks),
+                "feedback_tags": (("feedback_id", "tag_id"), links),
+                "comments": (comment_columns, comments),
+            })
+            feedbacks, links, comments = [], [], []
+    loader.report(("feedbacks", "feedback_tags", "comments"), step)
+
+    def notification_rows() -> Iterator[tuple]:
+        notification_id = itertools.count(1)
+        for user_id, user_created in enumerate(user_times, start=1):
+            for _ in range(power_law_count(rng, args.notification_alpha, args.max_notifications)):
+                at = user_created + (end - user_created) * rng.random()
+                # 越早的通知越可能已读
+                is_read = rng.random() < 0.95 - 0.5 * (at - start) / (end - start)
+                yield (next(notification_id), sentence(rng, 2, 5), sentence(rng, 5, 15), int(is_read), ts(at), user_id)
+
+    step = time.perf_counter()
+    await loader.insert(
+        "notifications", ("id", "title", "content", "is_read", "created_at", "user_id"), notification_rows()
+    )
+    loader.report(("notifications",), step)
+
+    schema_started = time.perf_counter()
+    await migrate()
+    await conn.execute_script("ANALYZE;")
+    print(f"full-text index and counters built in {time.perf_counter() - schema_started:.2f}s")
+    print(f"total {time.perf_counter() - started:.2f}s -> {args.db} ({os.path.getsize(args.db) / 1024 / 1024:.1f}MB)")
+    await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="输出的 SQLite 文件路径")
+    parser.add_argument("--overwrite", action="store_true", help="文件已存在时删除重建")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--feedback", type=int, default=100000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--fixed-end", action="store_true", help="时间窗口截止到 2026-01-01，而不是当前时间，使同一种子生成的数据完全相同")
+    parser.add_argument("--password", default="password", help="所有用户的登录密码")
+    parser.add_argument("--author-skew", type=float, default=1.1, help="作者 Zipf 指数")
+    parser.add_argument("--tag-skew", type=float, default=1.3, help="标签热度 Zipf 指数")
+    parser.add_argument("--comment-alpha", type=float, default=1.5, help="每条反馈评论数的 Pareto 指数，越小长尾越重")
+    parser.add_argument("--max-comments", type=int, default=500)
+    parser.add_argument("--notification-alpha", type=float, default=1.3)
+    parser.add_argument("--max-notifications", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50000, help="每个事务写入的行数")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.overwrite:
+            parser.error(f"{args.db} 已存在，使用 --overwrite 覆盖")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    asyncio.run(generate(args))
+
+
+if __name__ == "__main__":
+    main()
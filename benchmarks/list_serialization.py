@@ -0,0 +1,176 @@
+"""列表接口每页的 CPU 耗时：ORM 实例 + response_model 校验 + 标准库 json 与行元组 dict + orjson 的对比
+
+    python -m benchmarks.list_serialization --page-size 100 --content-chars 2000
+
+在临时库中写入带长正文的反馈、用户和通知，对 /feedback/、/users/、
+/users/{id}/notifications/ 分别测量三种实现处理一页所用的 CPU 时间（time.process_time，
+含查询、序列化和 ASGI 调用）：
+
+- orm_validate：原实现，返回模型实例，由 FastAPI 按 response_model 校验后用标准库 json 编码
+- rows_json：从行元组构造 dict 并跳过校验，未安装 orjson 时的退化路径
+- rows_orjson：从行元组构造 dict 并跳过校验，用 orjson 编码（当前实现）
+
+原实现在基准内以 /legacy 前缀注册到 main.app 上，经过相同的中间件。
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+WORDS = ["登录", "页面", "按钮", "无响应", "支付", "失败", "login", "page", "crash", "slow", "payment", "timeout"]
+
+
+def legacy_router():
+    """改动前的三个列表路由：返回模型实例，由 response_model 校验和编码"""
+    from fastapi import APIRouter
+    from app.core.pagination import KEYSET_ORDERING, next_cursor
+    from app.models.pydantic_models import FeedbackListResponse, NotificationListResponse, UserListResponse
+    from app.models.tortoise_models import Feedback, Notification, User
+    from app.services import FeedbackService, NotificationService
+
+    router = APIRouter()
+
+    @router.get("/feedback/", response_model=FeedbackListResponse)
+    async def feedback_list(limit: int = 100):
+        feedbacks = await Feedback.all().limit(limit).order_by(*KEYSET_ORDERING)
+        await FeedbackService._load_tags(feedbacks)
+        total = await FeedbackService.get_feedback_count()
+        return {"feedbacks": feedbacks, "total": total, "next_cursor": next_cursor(feedbacks, limit)}
+
+    @router.get("/users/", response_model=UserListResponse)
+    async def user_list(limit: int = 100):
+        users = await User.all().limit(limit).order_by(*KEYSET_ORDERING)
+        return {"users": users, "total": await User.all().count(), "next_cursor": next_cursor(users, limit)}
+
+    @router.get("/users/{user_id}/notifications/", response_model=NotificationListResponse)
+    async def notification_list(user_id: int, limit: int = 100):
+        notifications = await Notification.filter(user_id=user_id).limit(limit).order_by(*KEYSET_ORDERING)
+        unread_count = await NotificationService.get_unread_count(user_id)
+        return {
+            "notifications": notifications,
+            "total": len(notifications),
+            "unread_count": unread_count,
+            "next_cursor": next_cursor(notifications, limit)
+        }
+
+    return router
+
+
+async def populate(rows: int, content_chars: int, seed: int) -> None:
+    from tortoise.transactions import in_transaction
+
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def text(length: int) -> str:
+        words = []
+        while sum(map(len, words)) + len(words) < length:
+            words.append(rng.choice(WORDS))
+        return " ".join(words)[:length]
+
+    async with in_transaction() as conn:
+        await conn.execute_many(
+            "INSERT INTO users (id, username, email, name, password_hash, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (i, f"user{i}", f"user{i}@example.com", f"User {i}", "-", str(now - timedelta(minutes=i)), str(now))
+                for i in range(1, rows + 1)
+            ]
+        )
+        await conn.execute_many(
+            "INSERT INTO tags (id, name, description, usage_count, created_at) VALUES (?, ?, ?, 0, ?)",
+            [(i, f"tag{i}", None, str(now)) for i in range(1, 11)]
+        )
+        await conn.execute_many(
+            "INSERT INTO feedbacks (id, title, content, status, created_at, updated_at, user_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (i, text(40), text(content_chars), "pending", str(now - timedelta(minutes=i)), str(now), rng.randint(1, rows))
+                for i in range(1, rows + 1)
+            ]
+        )
+        await conn.execute_many(
+            "INSERT INTO feedback_tags (feedback_id, tag_id) VALUES (?, ?)",
+            [(i, tag) for i in range(1, rows + 1) for tag in rng.sample(range(1, 11), 2)]
+        )
+        await conn.execute_many(
+            "INSERT INTO notifications (id, title, content, is_read, created_at, user_id) VALUES (?, ?, ?, ?, ?, 1)",
+            [(i, text(20), text(content_chars // 4), i % 2, str(now - timedelta(minutes=i))) for i in range(1, rows + 1)]
+        )
+
+
+async def run(args: argparse.Namespace, db_path: str) -> Dict[str, Dict[str, float]]:
+    from main import app
+    from app.core import serialization
+    from app.core.config import settings
+    from app.models.migrations import migrate
+    from benchmarks.asgi_client import ASGIClient
+
+    settings.DATABASE_URL = f"sqlite://{db_path}"
+    api = settings.API_V1_STR
+    routes = [
+        ("feedback", "/feedback/"),
+        ("users", "/users/"),
+        ("notifications", "/users/1/notifications/"),
+    ]
+    orjson_module = serialization.orjson
+    app.include_router(legacy_router(), prefix="/legacy")
+    results: Dict[str, Dict[str, float]] = {}
+    async with app.router.lifespan_context(app):
+        await migrate()
+        await populate(args.page_size * 2, args.content_chars, args.seed)
+        client = ASGIClient(app)
+        prefixes = {"orm_validate": "/legacy", "rows_json": api, "rows_orjson": api}
+        for name, path in routes:
+            results[name] = {}
+            bodies = set()
+            for variant, prefix in prefixes.items():
+                serialization.orjson = None if variant == "rows_json" else orjson_module
+                samples: List[float] = []
+                for i in range(args.warmup + args.pages):
+                    started = time.process_time()
+                    response = await client.get(prefix + path, params={"limit": args.page_size})
+                    elapsed = time.process_time() - started
+                    assert response.status_code == 200, response.content[:200]
+                    if i >= args.warmup:
+                        samples.append(elapsed)
+                bodies.add(response.content)
+                results[name][variant] = statistics.median(samples) * 1000
+            results[name]["identical"] = len(bodies) == 1
+            results[name]["bytes"] = len(response.content)
+        serialization.orjson = orjson_module
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--content-chars", type=int, default=2000, help="每条反馈正文的字符数（通知正文为其 1/4）")
+    parser.add_argument("--pages", type=int, default=200, help="每种实现测量的页数")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ.setdefault("NOTIFICATION_RECONCILE_INTERVAL_SECONDS", "0")
+    os.environ.setdefault("SCHEMA_AUTO_MIGRATE", "true")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(run(args, os.path.join(tmp, "bench.db")))
+
+    from app.core import serialization
+
+    print(f"\npage size {args.page_size}, content {args.content_chars} chars, orjson {'installed' if serialization.orjson else 'missing'}")
+    print(f"{'route':<16}{'bytes':>10}{'orm_validate':>14}{'rows_json':>12}{'rows_orjson':>13}{'speedup':>9}  identical")
+    for name, row in results.items():
+        speedup: Optional[float] = row["orm_validate"] / row["rows_orjson"] if row["rows_orjson"] else None
+        print(
+            f"{name:<16}{row['bytes']:>10}{row['orm_validate']:>14.2f}{row['rows_json']:>12.2f}"
+            f"{row['rows_orjson']:>13.2f}{speedup:>8.1f}x  {row['identical']}"
+        )
+    print("(median CPU ms per page)")
+
+
+if __name__ == "__main__":
+    main()
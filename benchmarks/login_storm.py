@@ -0,0 +1,91 @@
+"""登录风暴期间其他接口的延迟
+
+    python -m benchmarks.login_storm --logins 200
+
+用临时数据库启动应用，先测量空闲时 GET /stats/feedback/ 的延迟，再在
+并发登录的同时持续探测同一接口，对比两者的分位数。
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label: str, samples: List[float]) -> None:
+    print(
+        f"{label:<12} n={len(samples):<5} "
+        f"p50={percentile(samples, 50) * 1000:7.2f}ms "
+        f"p95={percentile(samples, 95) * 1000:7.2f}ms "
+        f"max={max(samples) * 1000:7.2f}ms"
+    )
+
+
+async def probe(client, path: str, samples: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(path)
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+
+async def run(logins: int, probes: int) -> None:
+    from main import app
+    from app.core.security import password_hasher
+    from benchmarks.asgi_client import ASGIClient
+
+    api = "/api/v1"
+    probe_path = f"{api}/stats/feedback/"
+    async with app.router.lifespan_context(app):
+        client = ASGIClient(app)
+        await client.post(f"{api}/users/", json_body={
+            "username": "storm", "email": "storm@example.com", "name": "Storm", "password": "password"
+        })
+
+        idle: List[float] = []
+        for _ in range(probes):
+            started = time.perf_counter()
+            await client.get(probe_path)
+            idle.append(time.perf_counter() - started)
+
+        storm: List[float] = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, probe_path, storm, stop))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(f"{api}/users/login/", params={"username": "storm", "password": "password"})
+            for _ in range(logins)
+        ])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await prober
+
+    statuses = Counter(response.status_code for response in responses)
+    print(f"hash workers={password_hasher.max_workers} max pending={password_hasher.max_pending}")
+    print(f"{logins} logins in {elapsed:.2f}s, statuses: {dict(statuses)}")
+    report("idle", idle)
+    report("during storm", storm)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fb-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite://{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("SCHEMA_AUTO_MIGRATE", "true")
+    asyncio.run(run(args.logins, args.probes))
+
+
+if __name__ == "__main__":
+    main()
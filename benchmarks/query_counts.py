@@ -0,0 +1,204 @@
+"""检查列表、搜索和单条反馈接口的 SQL 条数与页大小无关
+
+    python -m benchmarks.query_counts
+    python -m benchmarks.query_counts --sizes 1,20,100,500
+
+在临时库中写入带标签的反馈，用 app.core.diagnostics.query_budget 统计 SQL 条数：
+
+- 分页场景（FeedbackService.get_feedback_list、search_feedback 的 trigram / 二元组 /
+  扫描三条路径，以及 /feedback/、/feedback/search/ 路由）在每个 --sizes 页大小下各执行一次，
+  条数必须处处相同且不超过 PAGE_QUERY_BUDGET。按行加载标签（N+1）会让条数随页大小增长
+- 单条反馈的读取和更新（get_feedback、update_feedback、update_feedback_status 及对应路由）
+  不超过各自的预算
+- 批量加载标签的 _get_feedback_tags_batch / _load_tags 每批只查询一次，空批次不查询
+
+有检查失败时打印执行次数最多的语句，并以状态码 1 退出。
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+TAGS_PER_FEEDBACK = 3
+# 每页的 SQL 上限：一页数据、一次批量标签、一次总数，路由另有少量固定开销
+PAGE_QUERY_BUDGET = 6
+# 正文同时命中 trigram（无响应）、二元组（登录）和单字扫描（慢）三条搜索路径
+CONTENT = "登录页面无响应，加载很慢"
+
+# (场景名, 页大小 -> 协程)；client 为进程内 ASGI 客户端
+PageScenario = Callable[[Any, int], Awaitable[Any]]
+
+
+def page_scenarios(api: str) -> List[Tuple[str, PageScenario]]:
+    from app.services import FeedbackService
+
+    async def route(client, path: str, **params) -> None:
+        response = await client.get(api + path, params=params)
+        assert response.status_code == 200, response.content[:200]
+
+    return [
+        ("feedback_list", lambda client, n: FeedbackService.get_feedback_list(limit=n)),
+        ("feedback_list_status", lambda client, n: FeedbackService.get_feedback_list(limit=n, status="pending")),
+        ("search_fts", lambda client, n: FeedbackService.search_feedback("无响应", limit=n)),
+        ("search_bigram", lambda client, n: FeedbackService.search_feedback("登录", limit=n)),
+        ("search_scan", lambda client, n: FeedbackService.search_feedback("慢", limit=n)),
+        ("route_feedback_list", lambda client, n: route(client, "/feedback/", limit=n)),
+        ("route_search_fts", lambda client, n: route(client, "/feedback/search/", keyword="无响应", limit=n)),
+        ("route_search_bigram", lambda client, n: route(client, "/feedback/search/", keyword="登录", limit=n)),
+        ("route_search_scan", lambda client, n: route(client, "/feedback/search/", keyword="慢", limit=n)),
+    ]
+
+
+def single_scenarios(api: str) -> List[Tuple[str, int, Callable[[Any], Awaitable[Any]]]]:
+    from app.models.pydantic_models import FeedbackUpdate
+    from app.services import FeedbackService
+
+    async def route(client, method: str, path: str, **kwargs) -> None:
+        response = await client.request(method, api + path, **kwargs)
+        assert response.status_code == 200, response.content[:200]
+
+    return [
+        ("get_feedback", 2, lambda client: FeedbackService.get_feedback(1)),
+        ("update_feedback", 3, lambda client: FeedbackService.update_feedback(1, FeedbackUpdate(title="改过的标题"))),
+        ("update_feedback_status", 3, lambda client: FeedbackService.update_feedback_status(1, "resolved")),
+        ("route_get_feedback", 2, lambda client: route(client, "GET", "/feedback/1/")),
+        ("route_feedback_detail", 4, lambda client: route(client, "GET", "/feedback/1/detail/")),
+        ("route_update_feedback", 3, lambda client: route(client, "PUT", "/feedback/1/", json_body={"title": "再改一次"})),
+    ]
+
+
+async def populate(rows: int) -> None:
+    from tortoise.transactions import in_transaction
+
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with in_transaction() as conn:
+        await conn.execute_query(
+            "INSERT INTO users (id, username, email, name, password_hash, created_at, updated_at) "
+            "VALUES (1, 'counts', 'counts@example.com', 'Counts', '-', ?, ?)",
+            [str(now), str(now)]
+        )
+        await conn.execute_many(
+            "INSERT INTO tags (id, name, description, usage_count, created_at) VALUES (?, ?, ?, 0, ?)",
+            [(i, f"tag{i}", None, str(now)) for i in range(1, 11)]
+        )
+        await conn.execute_many(
+            "INSERT INTO feedbacks (id, title, content, status, created_at, updated_at, user_id) "
+            "VALUES (?, ?, ?, 'pending', ?, ?, 1)",
+            [(i, f"反馈 {i}", CONTENT, str(now - timedelta(minutes=i)), str(now)) for i in range(1, rows + 1)]
+        )
+        await conn.execute_many(
+            "INSERT INTO feedback_tags (feedback_id, tag_id) VALUES (?, ?)",
+            [(i, (i + k) % 10 + 1) for i in range(1, rows + 1) for k in range(TAGS_PER_FEEDBACK)]
+        )
+
+
+async def counted(budget: int, run: Callable[[], Awaitable[Any]]) -> Tuple[int, str]:
+    """在 query_budget 中执行 run，返回 (SQL 条数, 超出预算时的错误信息)"""
+    from app.core.cache import entity_caches
+    from app.core.diagnostics import QueryBudgetExceededError, query_budget
+
+    # 清空实体缓存，使每次测量都走同样的查询路径
+    for cache in entity_caches:
+        cache.clear()
+    try:
+        with query_budget(budget) as tally:
+            await run()
+    except QueryBudgetExceededError as exc:
+        return tally.total, str(exc)
+    return tally.total, ""
+
+
+async def check(sizes: List[int]) -> int:
+    from main import app
+    from app.core.config import settings
+    from app.models.migrations import migrate
+    from app.models.tortoise_models import Feedback
+    from app.services import FeedbackService
+    from benchmarks.asgi_client import ASGIClient
+
+    await migrate()
+    await populate(max(sizes))
+    client = ASGIClient(app)
+    failures = 0
+
+    for name, scenario in page_scenarios(settings.API_V1_STR):
+        counts: Dict[int, int] = {}
+        errors = []
+        for size in sizes:
+            counts[size], error = await counted(PAGE_QUERY_BUDGET, lambda: scenario(client, size))
+            if error:
+                errors.append(f"limit={size}: {error}")
+        summary = ", ".join(f"limit={size}: {count}" for size, count in counts.items())
+        if errors or len(set(counts.values())) > 1:
+            failures += 1
+            print(f"FAIL {name}: SQL 条数随页大小变化或超出预算 {PAGE_QUERY_BUDGET} ({summary})")
+            for error in errors:
+                print(f"    {error}")
+            continue
+        print(f"ok   {name}: {summary}")
+
+    for name, budget, scenario in single_scenarios(settings.API_V1_STR):
+        total, error = await counted(budget, lambda: scenario(client))
+        if error:
+            failures += 1
+            print(f"FAIL {name}: {error}")
+            continue
+        print(f"ok   {name}: {total} queries (budget {budget})")
+
+    checks: List[Tuple[str, int, Callable[[], Awaitable[Any]]]] = [
+        ("tags_batch_empty", 0, lambda: FeedbackService._get_feedback_tags_batch([])),
+        ("load_tags_empty", 0, lambda: FeedbackService._load_tags([])),
+    ]
+    for size in sizes:
+        feedbacks = await Feedback.all().order_by("id").limit(size)
+        ids = [feedback.id for feedback in feedbacks]
+        checks.append((f"tags_batch_{size}", 1, lambda ids=ids: FeedbackService._get_feedback_tags_batch(ids)))
+        checks.append((f"load_tags_{size}", 1, lambda feedbacks=feedbacks: FeedbackService._load_tags(feedbacks)))
+
+    for name, budget, run in checks:
+        total, error = await counted(budget, run)
+        if error:
+            failures += 1
+            print(f"FAIL {name}: {error}")
+            continue
+        print(f"ok   {name}: {total} queries (budget {budget})")
+    return failures
+
+
+async def run(sizes: List[int], db_path: str) -> int:
+    from tortoise import Tortoise
+    from app.core.config import settings
+
+    await Tortoise.init(config=settings.tortoise_config(f"sqlite://{db_path}"))
+    try:
+        return await check(sizes)
+    finally:
+        await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,20,100", help="逗号分隔的页大小 / 批大小")
+    args = parser.parse_args()
+
+    try:
+        sizes = sorted({int(size) for size in args.sizes.split(",") if size.strip()})
+    except ValueError:
+        parser.error(f"无效的页大小: {args.sizes}")
+    if not sizes or sizes[0] < 1:
+        parser.error("页大小必须是正整数")
+
+    os.environ.setdefault("NOTIFICATION_RECONCILE_INTERVAL_SECONDS", "0")
+    os.environ.setdefault("SCHEMA_AUTO_MIGRATE", "true")
+    with tempfile.TemporaryDirectory() as tmp:
+        failures = asyncio.run(run(sizes, os.path.join(tmp, "counts.db")))
+    if failures:
+        print(f"\n{failures} checks failed")
+        raise SystemExit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""检查每个服务方法执行的 SQL 的查询计划
+
+    python -m benchmarks.query_plans --size 10k
+    python -m benchmarks.query_plans --size 100k --verbose
+
+复制一份 benchmarks.generate_data 生成的库（与 endpoint_latency 共用 --data-dir 缓存），
+迁移到最新版本并 ANALYZE，然后逐个调用 SCENARIOS 中的服务方法，记录它们执行的每条
+SQL，用原参数执行 EXPLAIN QUERY PLAN。计划中出现以下任一步骤即视为违规：
+
+- SCAN <表> 且没有使用索引（整表扫描；按索引顺序遍历、带 LIMIT 的 SCAN ... USING INDEX 不算）
+- USE TEMP B-TREE（为 ORDER BY / GROUP BY / DISTINCT 额外建临时排序树）
+
+ALLOWED 中列出有意为之的例外及原因。存在违规时以状态码 1 退出。
+
+ANALYZE 之后查询计划取决于表的大小，因此只在固定的真实规模（PLAN_SIZES，默认 10k）上判定：
+在 1k 这样的小库上，一个导出分块（EXPORT_CHUNK_SIZE=1000 条反馈）就覆盖了整张
+feedback_tags，规划器改用整表扫描是正确的选择，却会被误判为违规。
+"""
+import argparse
+import asyncio
+import os
+import re
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# (场景名, 语句片段) -> 原因；片段按子串匹配归一化后的 SQL
+ALLOWED: Dict[Tuple[str, str], str] = {
+    ("search_short_keyword", "LIKE"): "单个字符的关键词没有可用的全文索引，只能扫描",
+    ("search_short_keyword_count", "LIKE"): "同上",
+    ("search_fts", "bm25("): "按相关度排序必须对命中结果排序",
+    ("search_bigram", "bm25("): "同上",
+    ("rebuild_feedback_daily_counts", "GROUP BY day"): "全量重算，按表达式分组",
+    ("refresh_tag_usage_counts", "UPDATE tags"): "全量重算每个标签的使用次数",
+}
+
+# 判定查询计划使用的数据规模：足够大，使按页/按块的查询只命中表的一小部分
+PLAN_SIZES = ("10k", "100k")
+
+# 行数有上限（每个状态一行、每张自增表一行）的表，整表读取是预期行为
+SMALL_TABLES = {"feedback_status_counts", "sqlite_sequence"}
+
+_SCAN = re.compile(r"^SCAN (\S+)(.*)$")
+
+Scenario = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def violations_in(plan: List[str]) -> List[str]:
+    problems = []
+    for detail in plan:
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+            continue
+        match = _SCAN.match(detail)
+        if not match or "CONSTANT ROW" in detail or match.group(1) in SMALL_TABLES:
+            continue
+        if "VIRTUAL TABLE" not in match.group(2) and "INDEX" not in match.group(2):
+            problems.append(detail)
+    return problems
+
+
+async def _chunks(lines: List[str]):
+    yield ("\n".join(lines) + "\n").encode()
+
+
+def build_scenarios() -> List[Tuple[str, Scenario]]:
+    from app.models.pydantic_models import (
+        CommentCreate, FeedbackCreate, FeedbackUpdate, NotificationCreate, TagCreate, UserCreate, UserUpdate
+    )
+    from app.services import (
+        CommentService, ExportService, FeedbackService, ImportService,
+        NotificationService, StatsService, TagService, UserService
+    )
+
+    async def first_chunk(**filters):
+        async for chunk in ExportService.iter_feedback_chunks(**filters):
+            return chunk
+
+    async def second_page(fetch, **kwargs):
+        rows = await fetch(limit=20, **kwargs)
+        from app.core.pagination import next_cursor
+        return await fetch(limit=20, cursor=next_cursor(rows, 20), **kwargs)
+
+    since = datetime.now(timezone.utc) - timedelta(days=90)
+    return [
+        # 用户
+        ("create_user", lambda ids: UserService.create_user(
+            UserCreate(username="plan_user", email="plan@example.com", name="Plan", password="password"))),
+        ("get_user", lambda ids: UserService.get_user(ids["user"])),
+        ("get_user_by_username", lambda ids: UserService.get_user_by_username(ids["username"])),
+        ("get_user_by_email", lambda ids: UserService.get_user_by_email(ids["email"])),
+        ("users_page", lambda ids: UserService.get_users(limit=20)),
+        ("users_cursor_page", lambda ids: second_page(UserService.get_users)),
+        ("users_count", lambda ids: UserService.get_users_count()),
+        ("update_user", lambda ids: UserService.update_user(ids["user"], UserUpdate(name="Renamed"))),
+        ("authenticate_user", lambda ids: UserService.authenticate_user(ids["username"], "password")),
+        # 反馈
+        ("create_feedback", lambda ids: FeedbackService.create_feedback(
+            FeedbackCreate(title="plan", content="plan content", user_id=ids["user"]))),
+        ("get_feedback", lambda ids: FeedbackService.get_feedback(ids["feedback"])),
+        ("get_feedback_header", lambda ids: FeedbackService.get_feedback_header(ids["feedback"])),
+        ("feedback_page", lambda ids: FeedbackService.get_feedback_list(limit=20)),
+        ("feedback_offset_page", lambda ids: FeedbackService.get_feedback_list(skip=200, limit=20)),
+        ("feedback_cursor_page", lambda ids: second_page(FeedbackService.get_feedback_list)),
+        ("feedback_status_page", lambda ids: FeedbackService.get_feedback_list(limit=20, status="resolved")),
+        ("feedback_status_cursor_page", lambda ids: second_page(FeedbackService.get_feedback_list, status="resolved")),
+        ("feedback_count", lambda ids: FeedbackService.get_feedback_count()),
+        ("feedback_status_count", lambda ids: FeedbackService.get_feedback_count(status="resolved")),
+        ("search_fts", lambda ids: FeedbackService.search_feedback("payment", limit=20)),
+        ("search_fts_count", lambda ids: FeedbackService.search_feedback_count("payment")),
+        ("search_bigram", lambda ids: FeedbackService.search_feedback("登录", limit=20)),
+        ("search_bigram_count", lambda ids: FeedbackService.search_feedback_count("登录")),
+        ("search_short_keyword", lambda ids: FeedbackService.search_feedback("u", limit=20)),
+        ("search_short_keyword_count", lambda ids: FeedbackService.search_feedback_count("u")),
+        ("update_feedback", lambda ids: FeedbackService.update_feedback(ids["feedback"], FeedbackUpdate(title="new"))),
+        ("update_feedback_status", lambda ids: FeedbackService.update_feedback_status(ids["feedback"], "closed")),
+        ("get_feedback_tags", lambda ids: FeedbackService.get_feedback_tags(ids["feedback"])),
+        ("add_tag", lambda ids: FeedbackService.add_tag_to_feedback(ids["feedback"], ids["tag_name"])),
+        ("remove_tag", lambda ids: FeedbackService.remove_tag_from_feedback(ids["feedback"], ids["tag_name"])),
+        ("batch_tags_add", lambda ids: FeedbackService.batch_update_tags(ids["feedbacks"], ids["tag_names"], "add")),
+        ("batch_tags_remove", lambda ids: FeedbackService.batch_update_tags(ids["feedbacks"], ids["tag_names"], "remove")),
+        ("batch_tags_set", lambda ids: FeedbackService.batch_update_tags(ids["feedbacks"], ids["tag_names"][:1], "set")),
+        # 评论
+        ("create_comment", lambda ids: CommentService.create_comment(
+            CommentCreate(content="plan", user_id=ids["user"], feedback_id=ids["feedback"]))),
+        ("get_comment", lambda ids: CommentService.get_comment(ids["comment"])),
+        ("comments_page", lambda ids: CommentService.get_comments(ids["feedback"], limit=20)),
+        ("comments_cursor_page", lambda ids: second_page(CommentService.get_comments, feedback_id=ids["feedback"])),
+        ("comments_with_authors", lambda ids: CommentService.get_comments_with_authors(ids["feedback"])),
+        ("comments_count", lambda ids: CommentService.get_comments_count(ids["feedback"])),
+        ("update_comment", lambda ids: CommentService.update_comment(ids["comment"], "edited")),
+        ("delete_comment", lambda ids: CommentService.delete_comment(ids["comment"])),
+        # 标签
+        ("create_tag", lambda ids: TagService.create_tag(TagCreate(name="plan-tag", description="plan"))),
+        ("get_tag", lambda ids: TagService.get_tag(ids["tag"])),
+        ("get_tag_by_name", lambda ids: TagService.get_tag_by_name(ids["tag_name"])),
+        ("tags_page", lambda ids: TagService.get_tags(limit=20)),
+        ("tags_count", lambda ids: TagService.get_tags_count()),
+        ("hot_tags", lambda ids: TagService.get_hot_tags(10)),
+        ("refresh_tag_usage_counts", lambda ids: TagService.refresh_tag_usage_counts()),
+        # 通知
+        ("create_notification", lambda ids: NotificationService.create_notification(
+            NotificationCreate(user_id=ids["notified_user"], title="plan", content="plan"))),
+        ("get_notification", lambda ids: NotificationService.get_notification(ids["notification"])),
+        ("notifications_page", lambda ids: NotificationService.get_user_notifications(ids["notified_user"], limit=20)),
+        ("notifications_cursor_page", lambda ids: second_page(
+            NotificationService.get_user_notifications, user_id=ids["notified_user"])),
+        ("notifications_count", lambda ids: NotificationService.get_user_notifications_count(ids["notified_user"])),
+        ("unread_count", lambda ids: NotificationService.get_unread_count(ids["notified_user"])),
+        ("mark_read", lambda ids: NotificationService.mark_notification_as_read(ids["notification"])),
+        ("mark_all_read", lambda ids: NotificationService.mark_all_notifications_as_read(ids["notified_user"])),
+        ("reconcile_unread_counts", lambda ids: NotificationService.reconcile_unread_counts()),
+        ("clear_notifications", lambda ids: NotificationService.clear_all_notifications(ids["notified_user"])),
+        # 统计
+        ("user_stats", lambda ids: StatsService.get_user_stats()),
+        ("feedback_stats", lambda ids: StatsService.get_feedback_stats()),
+        ("rebuild_feedback_status_counts", lambda ids: StatsService.rebuild_feedback_status_counts()),
+        ("feedback_trend", lambda ids: StatsService.get_feedback_trend(30)),
+        ("rebuild_feedback_daily_counts", lambda ids: StatsService.rebuild_feedback_daily_counts()),
+        # 导入导出
+        ("export_chunk", lambda ids: first_chunk()),
+        ("export_chunk_filtered", lambda ids: first_chunk(status="resolved", created_from=since, include_comments=True)),
+        ("import_ndjson", lambda ids: ImportService.import_feedback_ndjson(_chunks([
+            f'{{"title": "imported", "content": "imported content", "user_id": {ids["user"]}}}'
+        ] * 3))),
+        # 删除放在最后，级联删除的行不影响前面的场景
+        ("delete_feedback", lambda ids: FeedbackService.delete_feedback(ids["feedback"])),
+        ("delete_tag", lambda ids: TagService.delete_tag(ids["tag"])),
+        ("delete_user", lambda ids: UserService.delete_user(ids["user"])),
+    ]
+
+
+async def pick_ids(conn) -> Dict[str, Any]:
+    async def one(sql: str) -> Any:
+        rows = await conn.execute_query_dict(sql)
+        return list(rows[0].values())[0]
+
+    user = await one("SELECT user_id FROM feedbacks GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1")
+    feedback = await one("SELECT feedback_id FROM comments GROUP BY feedback_id ORDER BY COUNT(*) DESC LIMIT 1")
+    tag_rows = await conn.execute_query_dict("SELECT id, name FROM tags ORDER BY usage_count DESC LIMIT 3")
+    feedback_rows = await conn.execute_query_dict("SELECT id FROM feedbacks ORDER BY id DESC LIMIT 50")
+    notified_user = await one("SELECT user_id FROM notifications GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1")
+    user_row = (await conn.execute_query_dict(f"SELECT username, email FROM users WHERE id = {user}"))[0]
+    return {
+        "user": user,
+        "username": user_row["username"],
+        "email": user_row["email"],
+        "feedback": feedback,
+        "feedbacks": [row["id"] for row in feedback_rows],
+        "comment": await one(f"SELECT id FROM comments WHERE feedback_id = {feedback} LIMIT 1"),
+        "tag": tag_rows[-1]["id"],
+        "tag_name": tag_rows[0]["name"],
+        "tag_names": [row["name"] for row in tag_rows],
+        "notified_user": notified_user,
+        "notification": await one(
+            f"SELECT id FROM notifications WHERE user_id = {notified_user} AND is_read = 0 LIMIT 1"
+        ),
+    }
+
+
+def allowed_reason(scenario: str, statement: str) -> Optional[str]:
+    for (name, fragment), reason in ALLOWED.items():
+        if name == scenario and fragment in statement:
+            return reason
+    return None
+
+
+async def check(db_path: str, verbose: bool) -> int:
+    from tortoise import Tortoise, connections
+    from app.core.cache import entity_caches
+    from app.core.config import settings
+    from app.core.diagnostics import normalize_statement
+    from app.core.metrics import install_query_hook, query_hooks
+    from app.models.migrations import migrate
+
+    await Tortoise.init(config=settings.tortoise_config(f"sqlite://{db_path}"))
+    conn = connections.get("default")
+    await migrate()
+    await conn.execute_script("ANALYZE;")
+    ids = await pick_ids(conn)
+
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(query: str, values: Any, elapsed: float, route: str) -> None:
+        captured.append((query, values))
+
+    install_query_hook()
+    query_hooks.append(capture)
+
+    checked: Dict[Tuple[str, str], None] = {}
+    failures = 0
+    for name, scenario in build_scenarios():
+        for cache in entity_caches:
+            cache.clear()
+        captured.clear()
+        await scenario(ids)
+        statements = list(captured)
+        captured.clear()
+
+        for query, values in statements:
+            head = query.lstrip()[:8].upper()
+            if not head.startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+                continue
+            statement = normalize_statement(query)
+            if (name, statement) in checked:
+                continue
+            checked[(name, statement)] = None
+            if values and isinstance(values[0], (list, tuple)):
+                values = values[0]
+            rows = await conn.execute_query_dict("EXPLAIN QUERY PLAN " + query, list(values or []))
+            plan = [row["detail"] for row in rows]
+            problems = violations_in(plan)
+            reason = allowed_reason(name, statement) if problems else None
+            if problems and not reason:
+                failures += 1
+                print(f"FAIL {name}: {statement}")
+                for detail in plan:
+                    print(f"    {'!' if detail in problems else ' '} {detail}")
+            elif verbose:
+                print(f"{'allow' if reason else 'ok   '} {name}: {statement[:150]}")
+                if reason:
+                    print(f"      ({reason})")
+                for detail in plan:
+                    print(f"      {detail}")
+
+    query_hooks.remove(capture)
+    await Tortoise.close_connections()
+    print(f"\n{len(checked)} statements checked, {failures} with full scans or temp B-tree sorts")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="10k", choices=PLAN_SIZES, help="数据规模（见上文，小库上的计划不作判定）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("/tmp", "fb-bench-data"))
+    parser.add_argument("--verbose", action="store_true", help="同时打印通过检查的语句及其计划")
+    args = parser.parse_args()
+
+    from benchmarks.endpoint_latency import ensure_database
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    source = ensure_database(args.data_dir, args.size, args.seed)
+
+    # 场景里有写操作，在副本上执行
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "plans.db")
+        shutil.copy(source, db_path)
+        failures = asyncio.run(check(db_path, args.verbose))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
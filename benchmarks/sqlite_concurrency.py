@@ -0,0 +1,122 @@
+"""SQLite 调优参数对并发读写吞吐的影响
+
+    python -m benchmarks.sqlite_concurrency --readers 4 --writers 2 --seconds 10
+
+分别用调优前的连接参数和 Settings 中的调优参数建库，多个进程同时读写
+同一个库文件（模拟多 worker 部署），统计每秒完成的读、写次数以及因锁冲突
+失败的次数。
+
+基线直接把数据库 URL 交给 Tortoise，不附加 PRAGMA，即调优前的实际行为：
+Tortoise 默认的 journal_mode=WAL，SQLite 默认的 synchronous=FULL、
+cache_size=-2000、mmap_size=0、temp_store=DEFAULT，以及 Python sqlite3
+默认的 5 秒锁等待。两组实际生效的参数会先打印出来。
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+# None 表示不附加任何 PRAGMA
+BASELINE: Optional[Dict[str, Any]] = None
+TUNED: Dict[str, Any] = {}
+PRAGMAS = ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store")
+
+
+async def _init(profile: Optional[Dict[str, Any]], db_url: str) -> None:
+    from tortoise import Tortoise
+    from tortoise.backends.base.config_generator import expand_db_url
+    from app.core.config import Settings
+
+    config = Settings(**(profile or {})).tortoise_config(db_url)
+    if profile is None:
+        config["connections"]["default"] = expand_db_url(db_url)
+    await Tortoise.init(config=config)
+
+
+async def _effective_pragmas(profile: Optional[Dict[str, Any]], db_url: str) -> str:
+    from tortoise import Tortoise, connections
+
+    await _init(profile, db_url)
+    conn = connections.get("default")
+    values = []
+    for pragma in PRAGMAS:
+        row = (await conn.execute_query_dict(f"PRAGMA {pragma}"))[0]
+        values.append(f"{pragma}={next(iter(row.values()))}")
+    await Tortoise.close_connections()
+    return " ".join(values)
+
+
+async def _setup(profile: Optional[Dict[str, Any]], db_url: str) -> None:
+    from tortoise import Tortoise
+    from app.models.migrations import migrate
+    from app.models.tortoise_models import User, Feedback
+
+    await _init(profile, db_url)
+    await migrate()
+    user = await User.create(username="bench", email="bench@example.com", name="Bench", password_hash="-")
+    await Feedback.bulk_create([
+        Feedback(title=f"反馈 {i}", content="基准测试内容" * 20, user_id=user.id) for i in range(1000)
+    ])
+    await Tortoise.close_connections()
+
+
+async def _work(profile: Optional[Dict[str, Any]], db_url: str, role: str, seconds: float) -> Dict[str, int]:
+    from tortoise import Tortoise
+    from tortoise.exceptions import OperationalError
+    from app.models.pydantic_models import FeedbackCreate
+    from app.services.feedback_service import FeedbackService
+
+    await _init(profile, db_url)
+    done = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            if role == "writer":
+                await FeedbackService.create_feedback(
+                    FeedbackCreate(title="并发写入", content="基准测试内容", user_id=1)
+                )
+            else:
+                await FeedbackService.get_feedback_list(limit=20)
+            done += 1
+        except OperationalError:
+            errors += 1
+    await Tortoise.close_connections()
+    return {"role": role, "done": done, "errors": errors}
+
+
+def _worker(args) -> Dict[str, int]:
+    return asyncio.run(_work(*args))
+
+
+def run_profile(name: str, profile: Optional[Dict[str, Any]], readers: int, writers: int, seconds: float) -> None:
+    workdir = tempfile.mkdtemp(prefix="fb-bench-")
+    db_url = f"sqlite://{os.path.join(workdir, f'{name}.db')}"
+    asyncio.run(_setup(profile, db_url))
+    print(f"{name:<8} {asyncio.run(_effective_pragmas(profile, db_url))}")
+
+    jobs = [(profile, db_url, "reader", seconds)] * readers + [(profile, db_url, "writer", seconds)] * writers
+    with multiprocessing.get_context("spawn").Pool(len(jobs)) as pool:
+        results = pool.map(_worker, jobs)
+
+    for role in ("reader", "writer"):
+        done = sum(r["done"] for r in results if r["role"] == role)
+        errors = sum(r["errors"] for r in results if r["role"] == role)
+        print(f"{name:<8} {role:<7} {done / seconds:9.1f} ops/s  errors={errors}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    run_profile("baseline", BASELINE, args.readers, args.writers, args.seconds)
+    run_profile("tuned", TUNED, args.readers, args.writers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
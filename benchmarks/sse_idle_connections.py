@@ -0,0 +1,127 @@
+"""大量空闲 SSE 推送连接的负载测试
+
+    python -m benchmarks.sse_idle_connections --connections 5000 --users 500
+
+用临时数据库启动应用，在进程内（不经过网络栈，不受文件描述符限制）打开大量
+GET /users/{id}/notifications/stream/ 连接并保持空闲，报告：
+
+- 建立连接耗时和每个连接的内存增量
+- 心跳是否按间隔送达
+- 创建通知后推送到该用户所有连接的延迟
+- 不读取响应的慢消费者被判定溢出，发布方不被阻塞
+- 全部断开后推送中心的连接数归零
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(connections: int, users: int, heartbeat: float, fanout_users: int) -> None:
+    from main import app
+    from app.core.config import settings
+    from app.core.notification_hub import notification_hub
+    from app.models.pydantic_models import NotificationCreate
+    from app.models.tortoise_models import User
+    from app.services import NotificationService
+    from benchmarks.asgi_client import open_stream
+
+    api = "/api/v1"
+    async with app.router.lifespan_context(app):
+        await User.bulk_create([
+            User(username=f"sse{i}", email=f"sse{i}@example.com", name=f"SSE {i}", password_hash="x")
+            for i in range(users)
+        ])
+        user_ids = [user_id for user_id in await User.all().order_by("id").values_list("id", flat=True)]
+
+        rss_before = rss_kb()
+        started = time.perf_counter()
+        handles = []
+        for offset in range(0, connections, 500):
+            batch = range(offset, min(offset + 500, connections))
+            handles.extend(await asyncio.gather(*[
+                open_stream(app, f"{api}/users/{user_ids[i % users]}/notifications/stream/") for i in batch
+            ]))
+        await asyncio.gather(*[handle.read_until(b"event: unread_count") for handle in handles])
+        elapsed = time.perf_counter() - started
+        rss_after = rss_kb()
+        statuses = {handle.status_code for handle in handles}
+        print(f"opened {connections} streams for {users} users in {elapsed:.2f}s, statuses: {statuses}")
+        print(f"rss +{(rss_after - rss_before) / 1024:.1f}MB, ~{(rss_after - rss_before) / connections:.1f}KB per stream")
+        print(f"hub: {notification_hub.stats()}")
+
+        # 心跳：所有连接在一个间隔后都应收到 ping
+        started = time.perf_counter()
+        await asyncio.gather(*[handle.read_until(b": ping", timeout=heartbeat * 3) for handle in handles])
+        print(f"heartbeat (interval {heartbeat}s) reached all streams after {time.perf_counter() - started:.2f}s")
+
+        # 推送延迟：创建通知到该用户所有连接收到事件
+        latencies = []
+        for user_id in user_ids[:fanout_users]:
+            targets = [h for i, h in enumerate(handles) if user_ids[i % users] == user_id]
+            started = time.perf_counter()
+            await NotificationService.create_notification(
+                NotificationCreate(user_id=user_id, title="bench", content="push")
+            )
+            await asyncio.gather(*[handle.read_until(b"event: notification") for handle in targets])
+            latencies.append(time.perf_counter() - started)
+        print(
+            f"push to {fanout_users} users (~{connections // users} streams each): "
+            f"p50={percentile(latencies, 50) * 1000:.2f}ms p95={percentile(latencies, 95) * 1000:.2f}ms "
+            f"max={max(latencies) * 1000:.2f}ms"
+        )
+
+        # 慢消费者：不读取响应，积压超过上限后被判定溢出
+        slow = await open_stream(app, f"{api}/users/{user_ids[0]}/notifications/stream/", paused=True)
+        dropped_before = notification_hub.dropped
+        started = time.perf_counter()
+        for _ in range(settings.NOTIFICATION_STREAM_QUEUE_SIZE + 10):
+            notification_hub.publish(user_ids[0], "notification", {"bench": True})
+            # 让正常连接有机会消费，只有慢消费者积压
+            await asyncio.sleep(0)
+        print(
+            f"slow consumer: {settings.NOTIFICATION_STREAM_QUEUE_SIZE + 10} publishes in "
+            f"{(time.perf_counter() - started) * 1000:.2f}ms, overflowed streams={notification_hub.dropped - dropped_before}"
+        )
+        await slow.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*[handle.close() for handle in handles])
+        print(f"closed all streams in {time.perf_counter() - started:.2f}s, hub connections left: {notification_hub.connection_count}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--heartbeat", type=float, default=1.0)
+    parser.add_argument("--fanout-users", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fb-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite://{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("SCHEMA_AUTO_MIGRATE", "true")
+    os.environ.setdefault("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", str(args.heartbeat))
+    os.environ.setdefault("NOTIFICATION_STREAM_MAX_CONNECTIONS", str(args.connections + 1))
+    os.environ.setdefault("NOTIFICATION_RECONCILE_INTERVAL_SECONDS", "0")
+    asyncio.run(run(args.connections, args.users, args.heartbeat, min(args.fanout_users, args.users)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,68 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from tortoise import Tortoise
 
 from app.core.config import settings
+from app.core.pagination import InvalidCursorError
+from app.core.security import PasswordHasherBusyError, password_hasher
+from app.core.notification_hub import NotificationHubFullError, notification_hub
+from app.core.identity_map import RequestScopeMiddleware
+from app.core.metrics import MetricsMiddleware, CallbackMetric, registry as metrics_registry, install_query_hook
+from app.core.cache import entity_caches
+from app.core.diagnostics import DiagnosticsMiddleware, QueryBudgetExceededError, query_diagnostics
+from app.models.migrations import ensure_schema
 from app.api.api_v1 import router as api_v1_router
+from app.services import NotificationService
+from app.services.notification_writer import notification_writer
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理：初始化和关闭数据库连接"""
+    started = time.perf_counter()
     # 初始化Tortoise ORM
-    await Tortoise.init(
-        db_url=settings.DATABASE_URL,
-        modules={"models": ["app.models.tortoise_models"]}
-    )
-    # 创建数据库表
-    await Tortoise.generate_schemas()
+    await Tortoise.init(config=settings.tortoise_config())
+    # 数据库客户端类在 init 时加载，之后才能挂上 SQL 计时
+    if settings.METRICS_ENABLED:
+        install_query_hook()
+    if settings.DIAGNOSTICS_ENABLED:
+        query_diagnostics.install()
+    # 只比对结构版本和指纹（一次单行查询）；建表、索引、触发器由 migrate.py 离线执行
+    applied = await ensure_schema(settings.SCHEMA_AUTO_MIGRATE)
+    if applied is not None:
+        print(f"Schema migrated (applied: {applied or 'none, objects synced'})")
+    app.state.startup_seconds = time.perf_counter() - started
+    print(f"Database ready in {app.state.startup_seconds * 1000:.1f}ms")
+    
+    # 通知写入组提交
+    if settings.NOTIFICATION_WRITE_BEHIND:
+        notification_writer.start()
+    
+    # 定期校准未读通知计数
+    reconcile_task = None
+    if settings.NOTIFICATION_RECONCILE_INTERVAL_SECONDS > 0:
+        reconcile_task = asyncio.create_task(
+            NotificationService.run_reconcile_loop(settings.NOTIFICATION_RECONCILE_INTERVAL_SECONDS)
+        )
     
     yield
     
+    # 结束所有推送连接
+    notification_hub.close_all()
+    # 提交写入队列中剩余的通知写入
+    await notification_writer.stop()
+    
+    if reconcile_task:
+        reconcile_task.cancel()
+        # 任务可能已结束或异常退出，关闭流程不因此中断
+        await asyncio.gather(reconcile_task, return_exceptions=True)
+    
     # 关闭数据库连接
     await Tortoise.close_connections()
+    # 关闭密码哈希线程池
+    password_hasher.shutdown()
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -29,7 +72,62 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 请求级身份映射（同一请求内同一实体只查一次库）
+app.add_middleware(RequestScopeMiddleware, debug_headers=settings.DEBUG_QUERY_HEADERS)
+
+# SQL 诊断：慢查询、N+1 与查询预算
+if settings.DIAGNOSTICS_ENABLED:
+    app.add_middleware(DiagnosticsMiddleware)
+
+# 请求延迟/状态码与 SQL 耗时指标
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    metrics_registry.register(CallbackMetric(
+        "notification_stream_connections", "Open notification SSE streams.",
+        lambda: notification_hub.connection_count
+    ))
+    metrics_registry.register(CallbackMetric(
+        "notification_write_queue_depth", "Notification writes waiting for group commit.",
+        lambda: notification_writer.queue_depth
+    ))
+    metrics_registry.register(CallbackMetric(
+        "app_startup_duration_seconds", "Time from lifespan start until the database schema was verified.",
+        lambda: getattr(app.state, "startup_seconds", 0)
+    ))
+    for cache in entity_caches:
+        metrics_registry.register(CallbackMetric(
+            f"entity_cache_{cache.name}_hits_total", f"Hits of the {cache.name} entity cache.",
+            lambda cache=cache: cache.hits, "counter"
+        ))
+        metrics_registry.register(CallbackMetric(
+            f"entity_cache_{cache.name}_misses_total", f"Misses of the {cache.name} entity cache.",
+            lambda cache=cache: cache.misses, "counter"
+        ))
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+# 无效的分页游标统一返回 400
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+# 密码哈希队列已满时返回 503，提示客户端稍后重试
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# 推送连接数已满时返回 503
+@app.exception_handler(NotificationHubFullError)
+async def notification_hub_full_handler(request: Request, exc: NotificationHubFullError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
 
+# 诊断模式下超出查询预算（DIAGNOSTICS_FAIL_ON_VIOLATION）时返回 500
+@app.exception_handler(QueryBudgetExceededError)
+async def query_budget_exceeded_handler(request: Request, exc: QueryBudgetExceededError):
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
 
 # 根路径
 @app.get("/")
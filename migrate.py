@@ -0,0 +1,59 @@
+"""数据库结构迁移（离线执行，发布时在启动应用之前运行一次）
+
+    python migrate.py                                   # 执行待执行迁移
+    python migrate.py --check                           # 只检查，不一致时以状态码 1 退出
+    python migrate.py --database-url sqlite://./other.db
+
+应用启动时只读取 schema_version 中的版本和指纹做比对；SCHEMA_AUTO_MIGRATE 关闭时，
+不一致会直接拒绝启动并提示运行本命令。
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from tortoise import Tortoise
+
+from app.core.config import settings
+from app.models.migrations import (
+    LATEST_VERSION, SchemaOutOfDateError, get_schema_state, migrate, pending_migrations, schema_fingerprint
+)
+
+
+async def run(database_url: str, check: bool) -> int:
+    await Tortoise.init(config=settings.tortoise_config(database_url))
+    try:
+        state = await get_schema_state()
+        expected = schema_fingerprint()
+        pending = await pending_migrations()
+        print(f"database: {database_url}")
+        print(f"recorded: {f'version {state[0]}, fingerprint {state[1]}' if state else '未初始化'}")
+        print(f"expected: version {LATEST_VERSION}, fingerprint {expected}")
+        for version, description, _ in pending:
+            print(f"  pending {version}: {description}")
+
+        if check:
+            return 0 if state == (LATEST_VERSION, expected) else 1
+
+        started = time.perf_counter()
+        try:
+            applied = await migrate()
+        except SchemaOutOfDateError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        print(f"applied {applied or 'no migrations'}, schema synced in {time.perf_counter() - started:.2f}s")
+        return 0
+    finally:
+        await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--check", action="store_true", help="只检查版本和指纹，不执行迁移")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.database_url, args.check)))
+
+
+if __name__ == "__main__":
+    main()